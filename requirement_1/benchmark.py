@@ -0,0 +1,232 @@
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from array import array
+
+from requirement1 import ALGORITHMS, CSRGraph, PathFinder
+
+
+def csr_from_edges(num_nodes, sources, targets, weights):
+    """CSRGraph with names "0".."n-1" from parallel edge arrays."""
+    names = [str(i) for i in range(num_nodes)]
+    return CSRGraph.from_edges(names, sources, targets, weights)
+
+
+def _add_road(sources, targets, weights, u, v, w):
+    # roads are two-way
+    sources.append(u)
+    targets.append(v)
+    weights.append(w)
+    sources.append(v)
+    targets.append(u)
+    weights.append(w)
+
+
+def grid_network(num_nodes, seed):
+    """Square grid of intersections with random 1-10 road weights."""
+    rng = random.Random(seed)
+    side = max(2, int(math.isqrt(num_nodes)))
+    sources, targets, weights = array("q"), array("q"), array("q")
+    for row in range(side):
+        for col in range(side):
+            u = row * side + col
+            if col + 1 < side:
+                _add_road(sources, targets, weights, u, u + 1, rng.randint(1, 10))
+            if row + 1 < side:
+                _add_road(sources, targets, weights, u, u + side, rng.randint(1, 10))
+    return csr_from_edges(side * side, sources, targets, weights)
+
+
+def geometric_network(num_nodes, seed, degree=6):
+    """Random geometric graph: points in the unit square joined when closer than a radius.
+
+    The radius is chosen for the given expected degree, and a cell grid keeps
+    neighbour finding linear. Weights are distances scaled to integers.
+    """
+    rng = random.Random(seed)
+    xs = [rng.random() for _ in range(num_nodes)]
+    ys = [rng.random() for _ in range(num_nodes)]
+    radius = math.sqrt(degree / (math.pi * num_nodes))
+    cells_per_side = max(1, int(1 / radius))
+    cells = {}
+    for i in range(num_nodes):
+        key = (int(xs[i] * cells_per_side), int(ys[i] * cells_per_side))
+        cells.setdefault(key, []).append(i)
+
+    scale = 1000 / radius
+    sources, targets, weights = array("q"), array("q"), array("q")
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                for u in members:
+                    for v in others:
+                        if v <= u:
+                            continue
+                        d = math.hypot(xs[u] - xs[v], ys[u] - ys[v])
+                        if d <= radius:
+                            _add_road(sources, targets, weights, u, v, int(d * scale) + 1)
+    return csr_from_edges(num_nodes, sources, targets, weights)
+
+
+def hub_network(num_nodes, seed):
+    """Hub-and-spoke network: a ring of hubs with express links, each hub serving a chain of local streets."""
+    rng = random.Random(seed)
+    hubs = max(2, int(math.isqrt(num_nodes)))
+    sources, targets, weights = array("q"), array("q"), array("q")
+    for h in range(hubs):
+        _add_road(sources, targets, weights, h, (h + 1) % hubs, rng.randint(5, 20))
+        _add_road(sources, targets, weights, h, rng.randrange(hubs), rng.randint(20, 60))
+    for node in range(hubs, num_nodes):
+        hub = node % hubs
+        _add_road(sources, targets, weights, node, hub, rng.randint(1, 30))
+        # local street to the previous spoke of the same hub
+        if node - hubs >= hubs:
+            _add_road(sources, targets, weights, node, node - hubs, rng.randint(1, 10))
+    return csr_from_edges(num_nodes, sources, targets, weights)
+
+
+GENERATORS = {
+    "grid": grid_network,
+    "geometric": geometric_network,
+    "hub": hub_network,
+}
+
+
+def query_set(graph, count, seed):
+    """Fixed seeded (start, goal) pairs for a graph."""
+    rng = random.Random(seed)
+    names = graph.names
+    return [(names[rng.randrange(len(names))], names[rng.randrange(len(names))])
+            for _ in range(count)]
+
+
+def measure(pathfinder, algorithm, queries, repeat):
+    """Time repeated passes over queries, then one traced pass for peak memory and counters."""
+    search = getattr(pathfinder, algorithm)
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for start, goal in queries:
+            search(start, goal)
+        timings.append(time.perf_counter() - start_time)
+
+    totals = {"expansions": 0, "relaxations": 0, "pushes": 0, "pops": 0}
+    pathfinder.instrument = True
+    tracemalloc.start()
+    try:
+        for start, goal in queries:
+            search(start, goal)
+            for field in totals:
+                totals[field] += getattr(pathfinder.last_stats, field)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        pathfinder.instrument = False
+
+    return {
+        "time_min_ms": min(timings) * 1000,
+        "time_median_ms": statistics.median(timings) * 1000,
+        "time_per_query_us": min(timings) / max(1, len(queries)) * 1e6,
+        "peak_memory_bytes": peak,
+        **totals,
+    }
+
+
+def run_suite(kinds, sizes, algorithms, queries=20, repeat=3, seed=0, landmarks=0):
+    """Yield one result record per (network kind, size, algorithm)."""
+    for kind in kinds:
+        for size in sizes:
+            start_time = time.perf_counter()
+            graph = GENERATORS[kind](size, seed)
+            build_time = time.perf_counter() - start_time
+
+            pathfinder = PathFinder(graph)
+            preprocess_time = 0.0
+            if landmarks:
+                start_time = time.perf_counter()
+                pathfinder.build_landmark_heuristic(landmarks)
+                preprocess_time = time.perf_counter() - start_time
+
+            pairs = query_set(graph, queries, seed)
+            for algorithm in algorithms:
+                record = {
+                    "kind": kind,
+                    "size": size,
+                    "nodes": graph.num_nodes,
+                    "edges": graph.num_edges,
+                    "seed": seed,
+                    "algorithm": algorithm,
+                    "heuristic": f"alt-{landmarks}" if landmarks else "zero",
+                    "queries": len(pairs),
+                    "repeat": repeat,
+                    "build_s": build_time,
+                    "preprocess_s": preprocess_time,
+                    "python": platform.python_version(),
+                }
+                record.update(measure(pathfinder, algorithm, pairs, repeat))
+                yield record
+
+
+def load_results(filename):
+    with open(filename) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(baseline, current, tolerance=0.2, metric="time_min_ms"):
+    """Records of current whose metric grew by more than tolerance over the matching baseline record."""
+    def key(record):
+        return (record["kind"], record["size"], record["seed"], record["algorithm"],
+                record["heuristic"], record["queries"])
+
+    reference = {key(record): record for record in baseline}
+    regressions = []
+    for record in current:
+        old = reference.get(key(record))
+        if old and old[metric] > 0 and record[metric] > old[metric] * (1 + tolerance):
+            regressions.append((key(record), old[metric], record[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PathFinder searches on synthetic road networks.")
+    parser.add_argument("--kinds", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--landmarks", type=int, default=0, help="use ALT with this many landmarks")
+    parser.add_argument("--output", default="benchmark_results.jsonl")
+    parser.add_argument("--baseline", help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    with open(args.output, "w") as f:
+        for record in run_suite(args.kinds, args.sizes, args.algorithms, args.queries,
+                                args.repeat, args.seed, args.landmarks):
+            results.append(record)
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            print(f"{record['kind']:>9} n={record['nodes']:<9} {record['algorithm']:<21} "
+                  f"{record['time_per_query_us']:12.1f} us/query  "
+                  f"{record['peak_memory_bytes'] / 1024:10.1f} KiB peak")
+
+    if args.baseline:
+        regressions = find_regressions(load_results(args.baseline), results, args.tolerance)
+        for key, old, new in regressions:
+            print(f"REGRESSION {key}: {old:.3f} -> {new:.3f} ms")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,1158 @@
+import argparse
+import csv
 import heapq
-from collections import deque
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from multiprocessing import Pool, shared_memory
 import time
-import pandas as pd
-import matplotlib.pyplot as plt
-import networkx as nx
+import numpy as np
+# pandas, matplotlib and networkx are imported only where tables or drawings are
+# made, so batch runs start fast
+
+class CSRGraph:
+    """Road network in compressed sparse row form.
+
+    Nodes are integer ids 0..n-1. The out-edges of node u are stored at
+    positions offsets[u]..offsets[u + 1] - 1 of the contiguous targets and
+    weights arrays, and names/index translate between location codes and ids.
+    """
+
+    def __init__(self, names, offsets, targets, weights, index=None):
+        # names may be any sequence (e.g. a file-backed NameTable); index any name -> id mapping
+        self.names = names if hasattr(names, "__getitem__") else list(names)
+        self.index = index if index is not None else {name: i for i, name in enumerate(self.names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.source_file = None  # set when the arrays are memory-mapped from a graph file
+        self._edge_slots = None
+
+    @classmethod
+    def from_dict(cls, graph):
+        """Build a CSR graph from the dict-of-lists {node: [(neighbor, weight), ...]} format."""
+        names = list(graph)
+        index = {name: i for i, name in enumerate(names)}
+        # nodes that only appear as neighbours still need an id
+        for edges in graph.values():
+            for neighbor, _ in edges:
+                if neighbor not in index:
+                    index[neighbor] = len(names)
+                    names.append(neighbor)
+
+        all_weights = [weight for edges in graph.values() for _, weight in edges]
+        typecode = "q" if all(isinstance(w, int) for w in all_weights) else "d"
+
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = array(typecode)
+        for name in names:
+            for neighbor, weight in graph.get(name, ()):
+                targets.append(index[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+        return cls(names, offsets, targets, weights)
+
+    @classmethod
+    def from_edges(cls, names, sources, targets, weights, typecode="q"):
+        """Build a CSR graph from parallel edge arrays of node ids (a counting sort by source)."""
+        num_nodes = len(names)
+        counts = [0] * (num_nodes + 1)
+        for u in sources:
+            counts[u + 1] += 1
+        for i in range(num_nodes):
+            counts[i + 1] += counts[i]
+        offsets = array("q", counts)
+        cursor = counts[:-1]
+        csr_targets = array("q", bytes(8 * len(sources)))
+        csr_weights = array(typecode, [0]) * len(sources)
+        for u, v, w in zip(sources, targets, weights):
+            slot = cursor[u]
+            csr_targets[slot] = v
+            csr_weights[slot] = w
+            cursor[u] = slot + 1
+        return cls(names, offsets, csr_targets, csr_weights)
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def weight_typecode(self):
+        # weights may be an array, a memoryview over shared memory or a numpy memmap
+        weights = self.weights
+        return getattr(weights, "typecode", None) or getattr(weights, "format", None) or weights.dtype.char
+
+    def edges(self, u):
+        """Return (target id, weight) pairs for the out-edges of node id u."""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    @property
+    def edge_slots(self):
+        """Index from u * num_nodes + v to the array slot of the cheapest u -> v edge, built on first use."""
+        if self._edge_slots is None:
+            n = self.num_nodes
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+            slots = {}
+            for u in range(n):
+                base = u * n
+                for e in range(offsets[u], offsets[u + 1]):
+                    key = base + targets[e]
+                    slot = slots.get(key)
+                    if slot is None or weights[e] < weights[slot]:
+                        slots[key] = e
+            self._edge_slots = slots
+        return self._edge_slots
+
+    def weight(self, u, v):
+        """Weight of the cheapest u -> v edge, or None if there is no such edge."""
+        slot = self.edge_slots.get(u * self.num_nodes + v)
+        return None if slot is None else self.weights[slot]
+
+    def set_weight(self, u, v, weight):
+        """Set the weight of every u -> v edge; the slot index stays valid since all copies match.
+
+        Integer weight arrays are switched to float64 the first time a
+        fractional (or infinite) weight arrives. Returns the previous weight.
+        """
+        if isinstance(weight, float) and self.weight_typecode in "bBhHiIlLqQ":
+            if weight.is_integer():
+                weight = int(weight)
+            elif isinstance(self.weights, array):
+                self.weights = array("d", self.weights)
+            else:
+                # shared-memory views and file-backed arrays cannot change type in place
+                raise ValueError(f"weight {weight} does not fit this graph's integer weights; "
+                                 "rebuild it with float weights to use fractional ones")
+        previous = None
+        for e in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[e] == v:
+                previous = self.weights[e]
+                self.weights[e] = weight
+        if previous is None:
+            raise KeyError((self.names[u], self.names[v]))
+        return previous
+
+    def reversed(self):
+        """Return the transposed graph (every edge u -> v becomes v -> u)."""
+        n = self.num_nodes
+        counts = [0] * (n + 1)
+        for v in self.targets:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array("q", counts)
+        cursor = counts[:-1]
+        targets = array("q", bytes(8 * self.num_edges))
+        weights = array(self.weight_typecode, [0]) * self.num_edges
+        for u in range(n):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[e]
+                slot = cursor[v]
+                targets[slot] = u
+                weights[slot] = self.weights[e]
+                cursor[v] = slot + 1
+        return CSRGraph(self.names, offsets, targets, weights, self.index)
+
+    # dict-style access by node name, so existing callers keep working
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        names = self.names
+        return [(names[v], w) for v, w in self.edges(self.index[name])]
+
+    def keys(self):
+        return list(self.names)
+
+
+class SearchStats:
+    """Work counters for one search, recorded only when PathFinder.instrument is on.
+
+    A search binds its frontier operations (push, pop, edge scan) to either the
+    plain functions or the counting versions below, so with instrumentation off
+    the loops run exactly the same calls as before.
+    """
+
+    COLUMNS = {
+        "expansions": "Expansions",
+        "relaxations": "Relaxations",
+        "pushes": "Heap Pushes",
+        "pops": "Heap Pops",
+        "stale_skipped": "Stale Skipped",
+        "peak_frontier": "Peak Frontier",
+    }
+
+    def __init__(self):
+        self.expansions = 0
+        self.relaxations = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_skipped = 0
+        self.peak_frontier = 0
+
+    def heappush(self, heap, item):
+        self.pushes += 1
+        heapq.heappush(heap, item)
+        if len(heap) > self.peak_frontier:
+            self.peak_frontier = len(heap)
+
+    def heappop(self, heap):
+        self.pops += 1
+        return heapq.heappop(heap)
+
+    def edge_range(self, lo, hi):
+        self.expansions += 1
+        self.relaxations += hi - lo
+        return range(lo, hi)
+
+    def counted_push(self, container):
+        """Counting replacement for container.append (FIFO queue or stack)."""
+        append = container.append
+
+        def push(item):
+            self.pushes += 1
+            append(item)
+            if len(container) > self.peak_frontier:
+                self.peak_frontier = len(container)
+        return push
+
+    def counted_pop(self, pop):
+        def counted():
+            self.pops += 1
+            return pop()
+        return counted
+
+    def heap_ops(self):
+        return self.heappush, self.heappop, self.edge_range
+
+    def finish(self, initial_frontier, goal_popped):
+        """Derive the pops that were skipped: every pop either expands a node or is the goal."""
+        self.pushes += initial_frontier
+        self.peak_frontier = max(self.peak_frontier, initial_frontier)
+        self.stale_skipped = self.pops - self.expansions - (1 if goal_popped else 0)
+
+    def as_row(self):
+        return {column: getattr(self, field) for field, column in self.COLUMNS.items()}
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy built once from a CSRGraph for fast repeated queries.
+
+    Nodes are contracted one at a time in edge-difference order. Whenever the
+    only shortest u -> w path runs through the contracted node v, a shortcut
+    u -> w (remembering v as its middle node) is added. A query then only
+    relaxes edges towards higher-ranked nodes from both ends, and shortcuts
+    are unpacked back into original edges at the end.
+    """
+
+    def __init__(self, graph, rank, up, down):
+        self.graph = graph
+        self.rank = rank
+        self.up = up  # forward search: v -> w edges with rank[w] > rank[v]
+        self.down = down  # backward search: u -> v edges stored at v, rank[u] > rank[v]
+
+    @classmethod
+    def build(cls, graph, witness_limit=500):
+        """Contract every node of graph. witness_limit caps each witness search's settled nodes."""
+        n = graph.num_nodes
+        out_adj = [dict() for _ in range(n)]
+        in_adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, weight in graph.edges(u):
+                if u == v:
+                    continue
+                # keep only the cheapest of parallel edges; middle -1 marks an original edge
+                if v not in out_adj[u] or weight < out_adj[u][v][0]:
+                    out_adj[u][v] = (weight, -1)
+                    in_adj[v][u] = (weight, -1)
+
+        def witness_search(source, skip, max_cost, targets):
+            dist = {source: 0}
+            heap = [(0, source)]
+            settled = 0
+            remaining = len(targets)
+            while heap and settled < witness_limit:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if d > max_cost:
+                    break
+                settled += 1
+                if u in targets:
+                    remaining -= 1
+                    if not remaining:
+                        break
+                for v, (weight, _) in out_adj[u].items():
+                    if v == skip:
+                        continue
+                    nd = d + weight
+                    if v not in dist or nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+            return dist
+
+        def shortcuts_for(v):
+            shortcuts = []
+            for u, (w_in, _) in in_adj[v].items():
+                candidates = {w: w_in + w_out for w, (w_out, _) in out_adj[v].items() if w != u}
+                if not candidates:
+                    continue
+                dist = witness_search(u, v, max(candidates.values()), candidates)
+                for w, cost in candidates.items():
+                    if dist.get(w, float("inf")) > cost:
+                        shortcuts.append((u, w, cost))
+            return shortcuts
+
+        deleted_neighbors = [0] * n
+
+        def priority(v, shortcuts):
+            edge_difference = len(shortcuts) - len(in_adj[v]) - len(out_adj[v])
+            return edge_difference + deleted_neighbors[v]
+
+        heap = [(priority(v, shortcuts_for(v)), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = array("q", [0]) * n
+        up_edges = [None] * n
+        down_edges = [None] * n
+        order = 0
+
+        while heap:
+            _, v = heapq.heappop(heap)
+            # lazy update: re-queue v if its priority got worse than the next candidate
+            shortcuts = shortcuts_for(v)
+            current = priority(v, shortcuts)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+
+            for u, w, cost in shortcuts:
+                if w not in out_adj[u] or cost < out_adj[u][w][0]:
+                    out_adj[u][w] = (cost, v)
+                    in_adj[w][u] = (cost, v)
+
+            # every remaining neighbour is contracted later, so it ranks higher than v
+            rank[v] = order
+            order += 1
+            up_edges[v] = [(w, weight, middle) for w, (weight, middle) in out_adj[v].items()]
+            down_edges[v] = [(u, weight, middle) for u, (weight, middle) in in_adj[v].items()]
+            for w in out_adj[v]:
+                del in_adj[w][v]
+                deleted_neighbors[w] += 1
+            for u in in_adj[v]:
+                del out_adj[u][v]
+                deleted_neighbors[u] += 1
+            out_adj[v] = in_adj[v] = None
+
+        return cls(graph, rank, cls._pack(graph, up_edges), cls._pack(graph, down_edges))
+
+    @staticmethod
+    def _pack(graph, edge_lists):
+        """Pack per-node (target, weight, middle) lists into a CSRGraph plus a middle array."""
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = array(graph.weight_typecode)
+        middles = array("q")
+        for edges in edge_lists:
+            for target, weight, middle in edges:
+                targets.append(target)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        packed = CSRGraph(graph.names, offsets, targets, weights, graph.index)
+        packed.middles = middles
+        return packed
+
+    def query(self, start, goal, stats=None):
+        """Shortest path from start to goal as (path, cost), or (None, None) if unreachable.
+
+        Pass a SearchStats as stats to record the work the query does.
+        """
+        g = self.graph
+        start_id, goal_id = g.index[start], g.index[goal]
+        if start_id == goal_id:
+            return [start], 0
+        if stats is None:
+            push, pop, edge_range = heapq.heappush, heapq.heappop, range
+        else:
+            push, pop, edge_range = stats.heap_ops()
+
+        graphs = (self.up, self.down)
+        dist = ({start_id: 0}, {goal_id: 0})
+        parent = ({start_id: -1}, {goal_id: -1})
+        heaps = ([(0, start_id)], [(0, goal_id)])
+        best_cost = float("inf")
+        meeting = -1
+
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                # a side is finished once its smallest key cannot improve the best meeting
+                if heap[0][0] >= best_cost:
+                    heap.clear()
+                    continue
+                d, current = pop(heap)
+                own_dist = dist[side]
+                if d > own_dist[current]:
+                    continue
+                other_dist = dist[1 - side]
+                if current in other_dist and d + other_dist[current] < best_cost:
+                    best_cost = d + other_dist[current]
+                    meeting = current
+
+                # stall-on-demand: skip current if a higher node already reaches it more cheaply
+                opposite = graphs[1 - side]
+                stalled = False
+                for e in range(opposite.offsets[current], opposite.offsets[current + 1]):
+                    higher = opposite.targets[e]
+                    if higher in own_dist and own_dist[higher] + opposite.weights[e] < d:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+
+                graph = graphs[side]
+                offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+                own_parent = parent[side]
+                for e in edge_range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[e]
+                    new_dist = d + weights[e]
+                    if neighbor not in own_dist or new_dist < own_dist[neighbor]:
+                        own_dist[neighbor] = new_dist
+                        own_parent[neighbor] = current
+                        push(heap, (new_dist, neighbor))
+
+        if stats is not None:
+            stats.finish(2, False)
+        if meeting == -1:
+            return None, None
+
+        # CH node sequence start..meeting..goal, then unpack every shortcut on it
+        hops = []
+        current = meeting
+        while current != -1:
+            hops.append(current)
+            current = parent[0][current]
+        hops.reverse()
+        current = parent[1][meeting]
+        while current != -1:
+            hops.append(current)
+            current = parent[1][current]
+
+        path = [start_id]
+        for i in range(len(hops) - 1):
+            self._unpack(hops[i], hops[i + 1], path)
+        return [g.names[node] for node in path], best_cost
+
+    def _middle(self, u, w):
+        """Middle node of the CH edge u -> w, or -1 if it is an original edge."""
+        if self.rank[u] < self.rank[w]:
+            graph, owner, target = self.up, u, w
+        else:
+            graph, owner, target = self.down, w, u
+        for e in range(graph.offsets[owner], graph.offsets[owner + 1]):
+            if graph.targets[e] == target:
+                return graph.middles[e]
+        raise KeyError((u, w))
+
+    def _unpack(self, u, w, path):
+        """Append the original nodes of CH edge u -> w (excluding u) to path."""
+        stack = [(u, w)]
+        while stack:
+            u, w = stack.pop()
+            middle = self._middle(u, w)
+            if middle == -1:
+                path.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+
+    def validate(self, pairs):
+        """Compare query costs with plain a_star; return the (start, goal, expected, got) mismatches."""
+        reference = PathFinder(self.graph)
+        mismatches = []
+        for start, goal in pairs:
+            _, expected = reference.a_star(start, goal)
+            path, cost = self.query(start, goal)
+            if cost != expected or (path and reference.calculate_path_cost(path) != cost):
+                mismatches.append((start, goal, expected, cost))
+        return mismatches
+
+
+class LandmarkHeuristic:
+    """ALT (A*, landmarks, triangle inequality) lower bounds for any goal.
+
+    Shortest distances from and to a few landmarks are computed once. For a
+    goal t and landmark L the triangle inequality gives
+    d(n, t) >= d(L, t) - d(L, n) and d(n, t) >= d(n, L) - d(t, L), so the
+    largest of these over all landmarks is an admissible, consistent h(n)
+    that needs no per-goal preprocessing.
+    """
+
+    def __init__(self, landmarks, from_landmark, to_landmark):
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark  # from_landmark[i][n] = d(L_i, n)
+        self.to_landmark = to_landmark  # to_landmark[i][n] = d(n, L_i)
+
+    @classmethod
+    def build(cls, graph, reverse_graph, count=4):
+        """Pick count landmarks by farthest-point selection and precompute their distance arrays."""
+        count = min(count, graph.num_nodes)
+        landmarks = []
+        from_landmark = []
+        to_landmark = []
+        # closeness[n] = distance from n to its nearest chosen landmark (either direction)
+        closeness = None
+        candidate = 0
+        for _ in range(count):
+            landmarks.append(candidate)
+            forward = dijkstra_distances(graph, candidate)
+            backward = dijkstra_distances(reverse_graph, candidate)
+            from_landmark.append(forward)
+            to_landmark.append(backward)
+
+            inf = float("inf")
+            if closeness is None:
+                closeness = array("d", [inf]) * graph.num_nodes
+            for n in range(graph.num_nodes):
+                nearest = min(forward[n], backward[n])
+                if nearest < closeness[n]:
+                    closeness[n] = nearest
+            # next landmark: the reachable node farthest from every chosen landmark
+            # (an unreachable node is picked only when nothing reachable is left)
+            best = -1.0
+            for n in range(graph.num_nodes):
+                value = closeness[n]
+                if value != inf and value > best and n not in landmarks:
+                    best, candidate = value, n
+            if best < 0:
+                remaining = [n for n in range(graph.num_nodes) if n not in landmarks]
+                if not remaining:
+                    break
+                candidate = remaining[0]
+        return cls(landmarks, from_landmark, to_landmark)
+
+    def estimate(self, node, goal):
+        """Lower bound on the distance from node id to goal id."""
+        inf = float("inf")
+        best = 0
+        for forward, backward in zip(self.from_landmark, self.to_landmark):
+            to_goal, to_node = forward[goal], forward[node]
+            if to_node != inf:
+                # L reaches node but not goal, so node cannot reach goal either
+                if to_goal == inf:
+                    return inf
+                if to_goal - to_node > best:
+                    best = to_goal - to_node
+            from_node, from_goal = backward[node], backward[goal]
+            if from_goal != inf:
+                # goal reaches L but node does not, so node cannot reach goal
+                if from_node == inf:
+                    return inf
+                if from_node - from_goal > best:
+                    best = from_node - from_goal
+        return best
+
+    def bound_to(self, goal):
+        """Per-goal view indexable by node id, as the searches expect from a heuristic table."""
+        return _LandmarkBound(self, goal)
+
+
+class _LandmarkBound:
+    """h(n) for one goal, evaluated on demand and memoised for the duration of a search."""
+
+    def __init__(self, landmarks, goal):
+        self.landmarks = landmarks
+        self.goal = goal
+        self.values = {}
+
+    def __getitem__(self, node):
+        value = self.values.get(node)
+        if value is None:
+            value = self.values[node] = self.landmarks.estimate(node, self.goal)
+        return value
+
+
+class GoalHeuristicCache:
+    """Exact per-goal heuristic tables, cached with LRU eviction under a memory budget.
+
+    A table holds the true shortest distance from every node to one goal (a
+    reverse Dijkstra), stored as an array of doubles indexed by node id. Popular
+    destinations therefore pay for the Dijkstra only once.
+    """
+
+    def __init__(self, reverse_graph, max_bytes=64 * 1024 * 1024):
+        self.reverse_graph = reverse_graph
+        self.max_bytes = max_bytes
+        self.tables = OrderedDict()  # goal id -> array("d"), least recently used first
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bound_to(self, goal):
+        """Distance-to-goal table for goal id, computed on a miss."""
+        table = self.tables.get(goal)
+        if table is not None:
+            self.hits += 1
+            self.tables.move_to_end(goal)
+            return table
+
+        self.misses += 1
+        table = dijkstra_distances(self.reverse_graph, goal)
+        size = table.itemsize * len(table)
+        if size > self.max_bytes:
+            return table  # too large to ever fit; use it for this search only
+        while self.bytes_used + size > self.max_bytes:
+            _, evicted = self.tables.popitem(last=False)
+            self.bytes_used -= evicted.itemsize * len(evicted)
+            self.evictions += 1
+        self.tables[goal] = table
+        self.bytes_used += size
+        return table
+
+    def stats(self):
+        """Counters and occupancy of the cache."""
+        return {
+            "tables": len(self.tables),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        self.tables.clear()
+        self.bytes_used = 0
+
+
+class DynamicRoute:
+    """One active start -> goal query kept up to date with Lifelong Planning A* (LPA*).
+
+    g holds each node's current distance estimate and rhs its one-step
+    lookahead (the best g(p) + c(p, n) over predecessors p). A node whose g
+    and rhs differ is inconsistent and sits in the queue. After an edge weight
+    changes only the head of that edge is re-examined, so the repair touches
+    just the part of the search tree the change affects.
+
+    LPA* needs every edge weight to be positive: after an increase, a
+    zero-weight cycle cut off from start would keep supporting its own g values.
+    """
+
+    def __init__(self, graph, reverse_graph, start, goal, heuristic=None):
+        if graph.num_edges and np.min(graph.weights) <= 0:
+            raise ValueError("dynamic routes need positive edge weights")
+        self.graph = graph
+        self.reverse_graph = reverse_graph
+        self.start = graph.index[start]
+        self.goal = graph.index[goal]
+        # the heuristic must stay admissible under every future weight change
+        self.heuristic = heuristic
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.queue = []
+        self.queued = {}  # node -> key of its live queue entry
+        self.expansions = 0
+        self._push(self.start)
+
+    def _h(self, node):
+        return 0 if self.heuristic is None else self.heuristic[node]
+
+    def _key(self, node):
+        inf = float("inf")
+        best = min(self.g.get(node, inf), self.rhs.get(node, inf))
+        return (best + self._h(node), best)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key, node))
+
+    def _update_vertex(self, node):
+        inf = float("inf")
+        if node != self.start:
+            g, reverse = self.g, self.reverse_graph
+            best = inf
+            for e in range(reverse.offsets[node], reverse.offsets[node + 1]):
+                candidate = g.get(reverse.targets[e], inf) + reverse.weights[e]
+                if candidate < best:
+                    best = candidate
+            self.rhs[node] = best
+        self.queued.pop(node, None)
+        if self.g.get(node, inf) != self.rhs.get(node, inf):
+            self._push(node)
+
+    def _top_key(self):
+        # drop entries superseded by a later push or removed from the queue
+        queue, queued = self.queue, self.queued
+        while queue and queued.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+        return queue[0][0] if queue else (float("inf"), float("inf"))
+
+    def compute(self):
+        """Bring the search up to date and return (path, cost) like PathFinder.a_star."""
+        inf = float("inf")
+        g, rhs, graph = self.g, self.rhs, self.graph
+        goal = self.goal
+        # ties with the goal's key are expanded too, so every node on a
+        # shortest path is consistent before the path is read off
+        while (self._top_key() <= self._key(goal)
+               or rhs.get(goal, inf) != g.get(goal, inf)):
+            if not self.queue:
+                break
+            _, current = heapq.heappop(self.queue)
+            del self.queued[current]
+            self.expansions += 1
+            if g.get(current, inf) > rhs.get(current, inf):
+                g[current] = rhs[current]  # overconsistent: settle it
+            else:
+                g[current] = inf  # underconsistent: reopen it and its successors
+                self._update_vertex(current)
+            for e in range(graph.offsets[current], graph.offsets[current + 1]):
+                self._update_vertex(graph.targets[e])
+        return self.path()
+
+    def path(self):
+        """Walk tight edges (g(p) + c(p, n) == g(n)) back from goal to rebuild the path."""
+        inf = float("inf")
+        cost = self.g.get(self.goal, inf)
+        if cost == inf:
+            return None, None
+        g, reverse = self.g, self.reverse_graph
+        successor = {self.goal: -1}
+        queue = deque([self.goal])
+        while queue:
+            current = queue.popleft()
+            if current == self.start:
+                break
+            g_current = g[current]
+            for e in range(reverse.offsets[current], reverse.offsets[current + 1]):
+                previous = reverse.targets[e]
+                if previous not in successor and g.get(previous, inf) + reverse.weights[e] == g_current:
+                    successor[previous] = current
+                    queue.append(previous)
+        if self.start not in successor:
+            return None, None  # no tight chain of edges reaches start
+        nodes = []
+        current = self.start
+        while current != -1:
+            nodes.append(self.graph.names[current])
+            current = successor[current]
+        return nodes, cost
+
+    def edge_changed(self, u, v):
+        """Note that the weight of edge id u -> id v changed; the next compute() repairs it."""
+        self._update_vertex(v)
+
+
+class TravelTimeProfiles:
+    """Piecewise-linear travel-time functions for the edges of a CSRGraph.
+
+    The breakpoints of edge slot e are times[profile_offsets[e]:profile_offsets[e + 1]]
+    with matching travel times in values, all held in shared arrays. An edge
+    with no breakpoints keeps its static weight. Outside its first and last
+    breakpoint a profile is constant. Every profile must be FIFO (departing later
+    never arrives earlier), which keeps a label-setting search exact.
+    """
+
+    def __init__(self, graph, profile_offsets, times, values):
+        self.graph = graph
+        self.profile_offsets = profile_offsets
+        self.times = times
+        self.values = values
+        self._lower_bound_graph = None
+
+    @classmethod
+    def from_dict(cls, graph, profiles):
+        """Build from {(u, v): [(departure_time, travel_time), ...]} keyed by node names."""
+        by_slot = {}
+        for (u, v), points in profiles.items():
+            points = sorted(points)
+            for (t0, w0), (t1, w1) in zip(points, points[1:]):
+                if t1 == t0:
+                    raise ValueError(f"profile for {u}->{v} has two breakpoints at t={t0}")
+                if (w1 - w0) / (t1 - t0) < -1:
+                    raise ValueError(f"profile for {u}->{v} is not FIFO between t={t0} and t={t1}")
+            u_id, v_id = graph.index[u], graph.index[v]
+            found = False
+            for e in range(graph.offsets[u_id], graph.offsets[u_id + 1]):
+                if graph.targets[e] == v_id:
+                    by_slot[e] = points
+                    found = True
+            if not found:
+                raise KeyError((u, v))
+
+        profile_offsets = array("q", [0])
+        times = array("d")
+        values = array("d")
+        for e in range(graph.num_edges):
+            for t, w in by_slot.get(e, ()):
+                times.append(t)
+                values.append(w)
+            profile_offsets.append(len(times))
+        return cls(graph, profile_offsets, times, values)
+
+    def travel_time(self, e, t):
+        """Travel time of edge slot e when entering it at time t."""
+        lo, hi = self.profile_offsets[e], self.profile_offsets[e + 1]
+        if lo == hi:
+            return self.graph.weights[e]
+        times, values = self.times, self.values
+        i = bisect_right(times, t, lo, hi)
+        if i == lo:
+            return values[lo]
+        if i == hi:
+            return values[hi - 1]
+        t0, t1 = times[i - 1], times[i]
+        w0 = values[i - 1]
+        return w0 + (values[i] - w0) * (t - t0) / (t1 - t0)
+
+    def static_weights_changed(self):
+        """Drop the lower-bound copy after the graph's static weights change."""
+        self._lower_bound_graph = None
+
+    def lower_bound_graph(self):
+        """Copy of the graph weighted by each edge's minimum travel time, for admissible heuristics."""
+        if self._lower_bound_graph is None:
+            g = self.graph
+            weights = array("d", g.weights)
+            for e in range(g.num_edges):
+                lo, hi = self.profile_offsets[e], self.profile_offsets[e + 1]
+                if lo != hi:
+                    weights[e] = min(self.values[lo:hi])
+            self._lower_bound_graph = CSRGraph(g.names, g.offsets, g.targets, weights, g.index)
+        return self._lower_bound_graph
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two (lat, lon) points in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialGrid:
+    """Uniform grid over node coordinates for nearest-node snapping.
+
+    Points are bucketed into square cells of about two points each, stored
+    CSR-style (cell_offsets into cell_points). A query scans rings of cells
+    outward from the query cell (clamped into the grid) and stops once no
+    unscanned cell can hold a closer point, so queries off the map stay cheap.
+    """
+
+    def __init__(self, xs, ys, points_per_cell=2):
+        self.xs = xs
+        self.ys = ys
+        n = len(xs)
+        self.min_x, self.max_x = min(xs), max(xs)
+        self.min_y, self.max_y = min(ys), max(ys)
+        width = max(self.max_x - self.min_x, 1e-12)
+        height = max(self.max_y - self.min_y, 1e-12)
+        self.cell_size = max(math.sqrt(width * height * points_per_cell / max(n, 1)), 1e-12)
+        self.columns = int(width / self.cell_size) + 1
+        self.rows = int(height / self.cell_size) + 1
+
+        cells = array("q", (self._cell(xs[i], ys[i]) for i in range(n)))
+        counts = [0] * (self.columns * self.rows + 1)
+        for c in cells:
+            counts[c + 1] += 1
+        for i in range(len(counts) - 1):
+            counts[i + 1] += counts[i]
+        self.cell_offsets = array("q", counts)
+        cursor = counts[:-1]
+        self.cell_points = array("q", bytes(8 * n))
+        for i, c in enumerate(cells):
+            self.cell_points[cursor[c]] = i
+            cursor[c] += 1
+
+    def _column_row(self, x, y):
+        column = min(max(int((x - self.min_x) / self.cell_size), 0), self.columns - 1)
+        row = min(max(int((y - self.min_y) / self.cell_size), 0), self.rows - 1)
+        return column, row
+
+    def _cell(self, x, y):
+        column, row = self._column_row(x, y)
+        return row * self.columns + column
+
+    def nearest(self, x, y):
+        """Id of the point closest to (x, y), with its distance."""
+        xs, ys = self.xs, self.ys
+        offsets, points = self.cell_offsets, self.cell_points
+        columns, rows, size = self.columns, self.rows, self.cell_size
+        column, row = self._column_row(x, y)
+        left, right = self.min_x, self.min_x + columns * size
+        low, high = self.min_y, self.min_y + rows * size
+        best, best_distance = -1, float("inf")
+        ring = 0
+        while True:
+            top, bottom = row - ring, row + ring
+            for r in range(max(top, 0), min(bottom, rows - 1) + 1):
+                if r == top or r == bottom:
+                    ring_columns = range(max(column - ring, 0), min(column + ring, columns - 1) + 1)
+                else:
+                    ring_columns = [c for c in (column - ring, column + ring) if 0 <= c < columns]
+                for c in ring_columns:
+                    cell = r * columns + c
+                    for k in range(offsets[cell], offsets[cell + 1]):
+                        i = points[k]
+                        d = math.hypot(xs[i] - x, ys[i] - y)
+                        if d < best_distance:
+                            best, best_distance = i, d
+
+            # cells not yet scanned lie in up to four rectangles beyond the sides
+            # of the scanned square; stop once none can hold a closer point
+            regions = []
+            if column + ring + 1 < columns:
+                regions.append((self.min_x + (column + ring + 1) * size, right, low, high))
+            if column - ring - 1 >= 0:
+                regions.append((left, self.min_x + (column - ring) * size, low, high))
+            if row + ring + 1 < rows:
+                regions.append((left, right, self.min_y + (row + ring + 1) * size, high))
+            if row - ring - 1 >= 0:
+                regions.append((left, right, low, self.min_y + (row - ring) * size))
+            bound = float("inf")
+            for x0, x1, y0, y1 in regions:
+                gap = math.hypot(max(x0 - x, 0.0, x - x1), max(y0 - y, 0.0, y - y1))
+                if gap < bound:
+                    bound = gap
+            if best_distance <= bound or bound == float("inf"):
+                return best, best_distance
+            ring += 1
+
+
+class CoordinateHeuristic:
+    """Straight-line (Euclidean or haversine) lower bounds with no preprocessing.
+
+    h(n) = scale * distance(n, goal). With scale no larger than the smallest
+    weight-per-distance ratio over all edges, the bound is admissible and
+    consistent, because straight-line distance obeys the triangle inequality.
+    """
+
+    def __init__(self, xs, ys, metric="euclidean", scale=1.0):
+        self.xs = xs
+        self.ys = ys
+        self.metric = metric
+        self.scale = scale
+        self.is_calibrated = False  # scale came from the edge weights, see calibrated
+
+    def distance(self, u, v):
+        if self.metric == "haversine":
+            # xs hold longitudes and ys latitudes
+            return haversine_km(self.ys[u], self.xs[u], self.ys[v], self.xs[v])
+        return math.hypot(self.xs[u] - self.xs[v], self.ys[u] - self.ys[v])
+
+    @classmethod
+    def calibrated(cls, graph, xs, ys, metric="euclidean"):
+        """Pick the largest admissible scale from the graph's own edges (one pass)."""
+        heuristic = cls(xs, ys, metric, 1.0)
+        scale = float("inf")
+        for u in range(graph.num_nodes):
+            for v, weight in graph.edges(u):
+                d = heuristic.distance(u, v)
+                if d > 0 and weight / d < scale:
+                    scale = weight / d
+        heuristic.scale = 0.0 if scale == float("inf") else scale
+        heuristic.is_calibrated = True
+        return heuristic
+
+    def bound_to(self, goal):
+        return _CoordinateBound(self, goal)
+
+
+class _CoordinateBound:
+    """h(n) towards one goal for CoordinateHeuristic, computed per lookup."""
+
+    def __init__(self, heuristic, goal):
+        self.heuristic = heuristic
+        self.goal = goal
+
+    def __getitem__(self, node):
+        heuristic = self.heuristic
+        return heuristic.scale * heuristic.distance(node, self.goal)
+
 
 class PathFinder:
     def __init__(self, graph, heuristic=None):
+        # dict-of-lists input is converted to CSR once, up front
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_dict(graph)
         self.graph = graph
-        self.heuristic = heuristic or {node: 0 for node in graph}
+        self._reverse_graph = None
+        self.contraction_hierarchy = None
+        self.dynamic_routes = []
+        self.travel_time_profiles = None
+        self.coordinates = None  # (xs, ys) arrays by node id, see set_coordinates
+        self.coordinate_metric = "euclidean"
+        self.spatial_index = None
+        self._layout = None  # cached drawing positions, see layout
+        self._time_dependent_heuristic = None
+        self.instrument = False  # when True, every search records a SearchStats in last_stats
+        self.last_stats = None
+        self.heuristic = heuristic or {}  # empty means zero for every node
+
+    @property
+    def reverse_graph(self):
+        """Transposed graph for backward searches, built on first use."""
+        if self._reverse_graph is None:
+            self._reverse_graph = self.graph.reversed()
+        return self._reverse_graph
+
+    def build_contraction_hierarchy(self, witness_limit=500):
+        """Preprocess the graph into a ContractionHierarchy, also used by later comparisons."""
+        self.contraction_hierarchy = ContractionHierarchy.build(self.graph, witness_limit)
+        return self.contraction_hierarchy
+
+    @classmethod
+    def from_file(cls, path):
+        """PathFinder over a graph file written by write_graph_file, memory-mapped rather than read."""
+        return cls(load_graph_file(path))
+
+    @property
+    def heuristic(self):
+        if self._heuristic_stale:
+            self._refresh_heuristic()
+        return self._heuristic
+
+    @heuristic.setter
+    def heuristic(self, values):
+        self._heuristic = values
+        self._heuristic_stale = False  # set when a weight drops below the bounds it was built from
+        if hasattr(values, "bound_to"):
+            # goal-independent providers (landmarks, cached tables) resolve per search
+            self._h = None
+        elif not values:
+            self._h = array("d", bytes(8 * self.graph.num_nodes))
+        else:
+            # keep an id-indexed copy so the search loops avoid name lookups
+            self._h = array("d", (values.get(name, 0) for name in self.graph.names))
+
+    def _heuristic_for(self, goal_id):
+        """Heuristic table indexable by node id for a search towards goal_id."""
+        if self._h is not None:
+            return self._h
+        return self.heuristic.bound_to(goal_id)
+
+    def build_landmark_heuristic(self, count=4):
+        """Switch gbfs and a_star to ALT landmark bounds, valid for every goal."""
+        self.heuristic = LandmarkHeuristic.build(self.graph, self.reverse_graph, count)
+        return self.heuristic
+
+    def set_coordinates(self, coordinates, metric="euclidean"):
+        """Attach {node: (x, y)} coordinates, or {node: (lat, lon)} with metric="haversine".
+
+        Every node needs a position. A SpatialGrid for nearest_node is built at
+        the same time; haversine snapping uses a local equirectangular projection.
+        """
+        g = self.graph
+        missing = [name for name in g if name not in coordinates]
+        if missing:
+            raise ValueError(f"no coordinates for {len(missing)} node(s), e.g. {missing[0]}")
+        if metric == "haversine":
+            xs = array("d", (coordinates[name][1] for name in g.names))
+            ys = array("d", (coordinates[name][0] for name in g.names))
+            self._longitude_scale = math.cos(math.radians(sum(ys) / len(ys)))
+            grid_xs = array("d", (x * self._longitude_scale for x in xs))
+            self.spatial_index = SpatialGrid(grid_xs, ys)
+        elif metric == "euclidean":
+            xs = array("d", (coordinates[name][0] for name in g.names))
+            ys = array("d", (coordinates[name][1] for name in g.names))
+            self.spatial_index = SpatialGrid(xs, ys)
+        else:
+            raise ValueError(f"unknown metric {metric!r}; use 'euclidean' or 'haversine'")
+        self.coordinates = (xs, ys)
+        self.coordinate_metric = metric
+
+    def nearest_node(self, x, y):
+        """Snap a point (x, y), or (lat, lon) for haversine coordinates, to the closest node name."""
+        if self.spatial_index is None:
+            raise ValueError("no coordinates set; call set_coordinates first")
+        if self.coordinate_metric == "haversine":
+            lat, lon = x, y
+            x, y = lon * self._longitude_scale, lat
+        node, _ = self.spatial_index.nearest(x, y)
+        return self.graph.names[node]
+
+    def build_coordinate_heuristic(self, scale=None):
+        """Switch gbfs and a_star to straight-line bounds from the node coordinates.
+
+        scale converts distance to edge weight (e.g. 1 / top speed for travel
+        times). By default it is calibrated from the edges so the bound stays
+        admissible.
+        """
+        if self.coordinates is None:
+            raise ValueError("no coordinates set; call set_coordinates first")
+        xs, ys = self.coordinates
+        if scale is None:
+            self.heuristic = CoordinateHeuristic.calibrated(self.graph, xs, ys, self.coordinate_metric)
+        else:
+            self.heuristic = CoordinateHeuristic(xs, ys, self.coordinate_metric, scale)
+        return self.heuristic
+
+    def enable_heuristic_cache(self, max_bytes=64 * 1024 * 1024):
+        """Switch gbfs and a_star to exact distance-to-goal tables kept in a GoalHeuristicCache."""
+        self.heuristic = GoalHeuristicCache(self.reverse_graph, max_bytes)
+        return self.heuristic
+
+    def _begin_search(self):
+        """Fresh SearchStats for the search about to run, or None with instrumentation off."""
+        if not self.instrument:
+            return None
+        self.last_stats = SearchStats()
+        return self.last_stats
+
+    def _to_names(self, parent, goal_id):
+        """Rebuild a node-name path from a parent map of ids (root maps to -1)."""
+        names = self.graph.names
+        path = []
+        current = goal_id
+        while current != -1:
+            path.append(names[current])
+            current = parent[current]
+        path.reverse()
+        return path
 
     def compare_algorithms_with_accuracy(self, start, goal):
-        """Compare all algorithms and generate performance metrics including accuracy."""
+        """Compare all algorithms and generate performance metrics including accuracy.
+
+        With instrument set, the search counters from SearchStats are added as
+        extra columns.
+        """
+        import pandas as pd
+
         algorithms = [
             ("BFS", self.bfs),
             ("DFS", self.dfs),
             ("GBFS", self.gbfs),
-            ("A*", self.a_star)
+            ("A*", self.a_star),
+            ("Bi-Dijkstra", self.bidirectional_search)
         ]
+        if self.contraction_hierarchy is not None:
+            ch = self.contraction_hierarchy
+            algorithms.append(("CH", lambda s, t: ch.query(s, t, self._begin_search())))
 
         results = []
 
@@ -25,9 +1160,10 @@ class PathFinder:
         optimal_path, optimal_cost = self.a_star(start, goal)
 
         for name, algo in algorithms:
-            start_time = time.time()
+            self.last_stats = None
+            start_time = time.perf_counter()
             path, cost = algo(start, goal)
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
 
             # Calculate Accuracy
             if optimal_cost and cost:  # Avoid division by zero
@@ -35,14 +1171,17 @@ class PathFinder:
             else:
                 accuracy = 0  # If no valid path, accuracy is 0%
 
-            results.append({
+            row = {
                 "Algorithm": name,
                 "Path": path if path else "No Path Found",
                 "Cost": cost if cost else "N/A",
                 "Time (ms)": round(execution_time * 1000, 6),  # Convert to milliseconds
                 "Path Length": len(path) if path else 0,
                 "Accuracy (%)": round(accuracy, 2)
-            })
+            }
+            if self.instrument and self.last_stats is not None:
+                row.update(self.last_stats.as_row())
+            results.append(row)
 
         return pd.DataFrame(results)
 
@@ -51,135 +1190,1002 @@ class PathFinder:
         """Calculate the total cost of a path."""
         if not path or len(path) < 2:
             return 0
+        g = self.graph
+        index, slots, weights, n = g.index, g.edge_slots, g.weights, g.num_nodes
         cost = 0
-        for i in range(len(path) - 1):
-            for neighbor, weight in self.graph[path[i]]:
-                if neighbor == path[i + 1]:
-                    cost += weight
-                    break
+        previous = index[path[0]]
+        for node in path[1:]:
+            current = index[node]
+            slot = slots.get(previous * n + current)
+            if slot is not None:
+                cost += weights[slot]
+            previous = current
         return cost
 
+    def calculate_path_costs(self, paths):
+        """Calculate the total cost of many paths in one call."""
+        return [self.calculate_path_cost(path) for path in paths]
+
+    def is_valid_path(self, path):
+        """Check that every consecutive pair of nodes in path is joined by an edge."""
+        g = self.graph
+        index, slots, n = g.index, g.edge_slots, g.num_nodes
+        if not path or any(node not in index for node in path):
+            return False
+        ids = [index[node] for node in path]
+        return all(ids[i] * n + ids[i + 1] in slots for i in range(len(ids) - 1))
+
+    def update_edge_weights(self, updates):
+        """Apply (u, v, weight) changes and drop structures derived from the old weights."""
+        g = self.graph
+        decreased = False
+        if self.dynamic_routes:
+            updates = list(updates)
+            for u, v, weight in updates:
+                if weight <= 0:
+                    raise ValueError(f"weight {weight} for {u} -> {v} must be positive "
+                                     "while dynamic routes are open")
+        for u, v, weight in updates:
+            u_id, v_id = g.index[u], g.index[v]
+            decreased |= weight < g.set_weight(u_id, v_id, weight)
+            if self._reverse_graph is not None:
+                self._reverse_graph.set_weight(v_id, u_id, weight)
+            for route in self.dynamic_routes:
+                route.edge_changed(u_id, v_id)
+
+        self.contraction_hierarchy = None
+        if not decreased:
+            return  # lower bounds from the old weights still hold after increases
+        # the time-dependent bounds are built from a copy of the static weights
+        self._time_dependent_heuristic = None
+        if self.travel_time_profiles is not None:
+            self.travel_time_profiles.static_weights_changed()
+        if hasattr(self._heuristic, "bound_to"):
+            self._heuristic_stale = True  # rebuilt by the next search that needs it
+
+    def _refresh_heuristic(self):
+        """Rebuild a goal-independent heuristic after weights dropped below its bounds."""
+        self._heuristic_stale = False
+        g, provider = self.graph, self._heuristic
+        if isinstance(provider, LandmarkHeuristic):
+            self.heuristic = LandmarkHeuristic.build(g, self.reverse_graph, len(provider.landmarks))
+        elif isinstance(provider, GoalHeuristicCache):
+            provider.clear()
+        elif isinstance(provider, CoordinateHeuristic) and provider.is_calibrated:
+            # a lowered weight can shrink the smallest weight-per-distance ratio
+            self.heuristic = CoordinateHeuristic.calibrated(g, provider.xs, provider.ys, provider.metric)
+
+    def update_edge_weight(self, u, v, weight):
+        """Change the weight of the u -> v road."""
+        self.update_edge_weights([(u, v, weight)])
+
+    def set_travel_time_profiles(self, profiles):
+        """Attach {(u, v): [(departure_time, travel_time), ...]} profiles for time_dependent_a_star."""
+        self.travel_time_profiles = TravelTimeProfiles.from_dict(self.graph, profiles)
+        self._time_dependent_heuristic = None
+        return self.travel_time_profiles
+
+    @contextmanager
+    def _shared_pool(self, workers):
+        """Process pool whose workers attach to this graph through shared memory.
+
+        The CSR arrays (and landmark tables or coordinates, if any) are copied
+        into shared memory once and every worker maps them at startup, so tasks
+        only carry their own arguments.
+        """
+        blocks = []
+        try:
+            def share(values):
+                shm, spec = _share_array(values)
+                blocks.append(shm)
+                return spec
+
+            g = self.graph
+            if g.source_file is not None:
+                # workers map the same file, so the OS shares its pages between them
+                graph_specs = ("file", g.source_file)
+            else:
+                graph_specs = ("arrays", g.names,
+                               (share(g.offsets), share(g.targets), share(g.weights)))
+            provider = self.heuristic
+            if isinstance(provider, LandmarkHeuristic):
+                heuristic_spec = ("landmarks", list(provider.landmarks),
+                                  [share(d) for d in provider.from_landmark],
+                                  [share(d) for d in provider.to_landmark])
+            elif isinstance(provider, GoalHeuristicCache):
+                heuristic_spec = ("cache", provider.max_bytes)
+            elif isinstance(provider, CoordinateHeuristic):
+                heuristic_spec = ("coordinates", share(array("d", provider.xs)),
+                                  share(array("d", provider.ys)), provider.metric, provider.scale)
+            else:
+                heuristic_spec = None  # a single-goal table does not fit mixed goals
+
+            with Pool(workers, _init_batch_worker, (graph_specs, heuristic_spec)) as pool:
+                yield pool
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def solve_many(self, pairs, workers=1, algorithm="a_star", chunk_size=256, tagged=False):
+        """Solve many (start, goal) pairs, yielding (path, cost) results in input order.
+
+        With workers > 1 the pairs are split into chunks across a process pool
+        sharing the graph (see _shared_pool). With tagged=True each result is a
+        (start, goal, path, cost, error) record instead, and a pair naming an
+        unknown location gives an error record rather than raising KeyError.
+        """
+        if workers <= 1:
+            search = getattr(self, algorithm)
+            index = self.graph.index
+            for start, goal in pairs:
+                yield _tagged_search(search, index, start, goal) if tagged else search(start, goal)
+            return
+
+        with self._shared_pool(workers) as pool:
+            tasks = ((algorithm, chunk, tagged) for chunk in _chunked(pairs, chunk_size))
+            for results in pool.imap(_solve_chunk, tasks):
+                yield from results
+
+    def distance_matrix(self, sources, targets=None, workers=1):
+        """Shortest distances from every source to every target as a dense NumPy array.
+
+        Each row is one Dijkstra sweep from a source that stops once every target
+        is settled; unreachable entries are inf. targets defaults to sources.
+        With workers > 1 the rows are computed in parallel over a shared graph.
+        """
+        g = self.graph
+        source_ids = [g.index[node] for node in sources]
+        target_ids = source_ids if targets is None else [g.index[node] for node in targets]
+        matrix = np.empty((len(source_ids), len(target_ids)))
+
+        if workers <= 1:
+            rows = (_one_to_many(g, source, target_ids) for source in source_ids)
+            for i, row in enumerate(rows):
+                matrix[i] = row
+            return matrix
+
+        with self._shared_pool(workers) as pool:
+            tasks = ((source, target_ids) for source in source_ids)
+            for i, row in enumerate(pool.imap(_distance_row, tasks)):
+                matrix[i] = row
+        return matrix
+
+    def isochrone(self, origin, max_cost, reverse=False):
+        """Every node reachable from origin within max_cost, as (ids, costs) NumPy arrays.
+
+        One bounded Dijkstra that stops at the cost limit; results are sorted by
+        cost and map back to names through graph.names. With reverse=True the
+        costs are from each node to origin instead (e.g. who can reach an incident).
+        """
+        graph = self.reverse_graph if reverse else self.graph
+        return _bounded_dijkstra(graph, self.graph.index[origin], max_cost)
+
+    def isochrones(self, origins, max_cost, reverse=False, workers=1):
+        """isochrone for many origins, yielding (ids, costs) in input order.
+
+        With workers > 1 the origins are spread over a process pool sharing the
+        graph (see _shared_pool).
+        """
+        index = self.graph.index
+        if workers <= 1:
+            for origin in origins:
+                yield self.isochrone(origin, max_cost, reverse)
+            return
+
+        with self._shared_pool(workers) as pool:
+            tasks = ((index[origin], max_cost, reverse) for origin in origins)
+            yield from pool.imap(_isochrone_task, tasks)
+
+    def open_dynamic_route(self, start, goal):
+        """Start tracking start -> goal; update_edge_weights repairs it instead of re-searching."""
+        route = DynamicRoute(self.graph, self.reverse_graph, start, goal)
+        self.dynamic_routes.append(route)
+        route.compute()
+        return route
+
+    def close_dynamic_route(self, route):
+        self.dynamic_routes.remove(route)
+
     def bfs(self, start, goal):
         """Improved BFS with early stopping and path tracking."""
-        visited = {start: None}  # Store parent nodes
-        queue = deque([start])
+        g = self.graph
+        offsets, targets = g.offsets, g.targets
+        start_id, goal_id = g.index[start], g.index[goal]
+        visited = {start_id: -1}  # Store parent nodes
+        queue = deque([start_id])
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = queue.append, queue.popleft, range
+        else:
+            push, pop, edge_range = stats.counted_push(queue), stats.counted_pop(queue.popleft), stats.edge_range
         
         while queue:
-            current = queue.popleft()
+            current = pop()
             
-            if current == goal:
+            if current == goal_id:
                 break
                 
-            for neighbor, _ in self.graph[current]:
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
                 if neighbor not in visited:
                     visited[neighbor] = current
-                    queue.append(neighbor)
+                    push(neighbor)
         
+        if stats is not None:
+            stats.finish(1, goal_id in visited)
+
         # Reconstruct path
-        if goal not in visited:
+        if goal_id not in visited:
             return None, None
             
-        path = []
-        current = goal
-        while current is not None:
-            path.append(current)
-            current = visited[current]
-            
-        path.reverse()
+        path = self._to_names(visited, goal_id)
         return path, self.calculate_path_cost(path)
 
     def dfs(self, start, goal):
         """Improved DFS with iterative implementation to prevent stack overflow."""
-        visited = {start: None}
-        stack = [(start, [start])]
+        g = self.graph
+        offsets, targets = g.offsets, g.targets
+        start_id, goal_id = g.index[start], g.index[goal]
+        # a node is pushed at most once, so its parent here is the path it was pushed with
+        visited = {start_id: -1}
+        stack = [start_id]
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = stack.append, stack.pop, range
+        else:
+            push, pop, edge_range = stats.counted_push(stack), stats.counted_pop(stack.pop), stats.edge_range
         
         while stack:
-            current, path = stack.pop()
+            current = pop()
             
-            if current == goal:
+            if current == goal_id:
+                if stats is not None:
+                    stats.finish(1, True)
+                path = self._to_names(visited, goal_id)
                 return path, self.calculate_path_cost(path)
                 
-            for neighbor, _ in self.graph[current]:
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
                 if neighbor not in visited:
                     visited[neighbor] = current
-                    stack.append((neighbor, path + [neighbor]))
+                    push(neighbor)
         
+        if stats is not None:
+            stats.finish(1, False)
         return None, None
 
     def gbfs(self, start, goal):
         """Improved GBFS with better priority queue handling."""
-        visited = set()
-        priority_queue = [(self.heuristic[start], start, [start])]
+        g = self.graph
+        offsets, targets = g.offsets, g.targets
+        start_id, goal_id = g.index[start], g.index[goal]
+        h = self._heuristic_for(goal_id)
+        # parent is fixed when a node is first popped, from the entry that reached it
+        came_from = {}
+        priority_queue = [(h[start_id], start_id, -1)]
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = heapq.heappush, heapq.heappop, range
+        else:
+            push, pop, edge_range = stats.heap_ops()
         
         while priority_queue:
-            _, current, path = heapq.heappop(priority_queue)
+            _, current, parent = pop(priority_queue)
             
-            if current == goal:
+            if current in came_from:
+                continue
+            came_from[current] = parent
+
+            if current == goal_id:
+                if stats is not None:
+                    stats.finish(1, True)
+                path = self._to_names(came_from, goal_id)
                 return path, self.calculate_path_cost(path)
                 
-            if current not in visited:
-                visited.add(current)
-                for neighbor, _ in self.graph[current]:
-                    if neighbor not in visited:
-                        heapq.heappush(priority_queue, 
-                                     (self.heuristic[neighbor], neighbor, path + [neighbor]))
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                if neighbor not in came_from:
+                    push(priority_queue, (h[neighbor], neighbor, current))
         
+        if stats is not None:
+            stats.finish(1, False)
         return None, None
 
     def a_star(self, start, goal):
         """Improved A* with better memory management and path reconstruction."""
+        g = self.graph
+        offsets, targets, weights = g.offsets, g.targets, g.weights
+        start_id, goal_id = g.index[start], g.index[goal]
+        h = self._heuristic_for(goal_id)
         visited = set()
-        came_from = {start: None}
-        g_score = {start: 0}
-        f_score = {start: self.heuristic[start]}
+        came_from = {start_id: -1}
+        g_score = {start_id: 0}
         
-        open_set = [(f_score[start], start)]
+        open_set = [(h[start_id], start_id)]
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = heapq.heappush, heapq.heappop, range
+        else:
+            push, pop, edge_range = stats.heap_ops()
         
         while open_set:
-            current = heapq.heappop(open_set)[1]
+            current = pop(open_set)[1]
             
-            if current == goal:
-                path = []
-                while current is not None:
-                    path.append(current)
-                    current = came_from[current]
-                path.reverse()
-                return path, g_score[goal]
-                
+            if current == goal_id:
+                if stats is not None:
+                    stats.finish(1, True)
+                return self._to_names(came_from, goal_id), g_score[goal_id]
+
+            # stale entry left behind by a later, cheaper push
+            if current in visited:
+                continue
             visited.add(current)
             
-            for neighbor, weight in self.graph[current]:
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
                 if neighbor in visited:
                     continue
                     
-                tentative_g_score = g_score[current] + weight
+                tentative_g_score = g_score[current] + weights[e]
                 
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = g_score[neighbor] + self.heuristic[neighbor]
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                    push(open_set, (tentative_g_score + h[neighbor], neighbor))
         
+        if stats is not None:
+            stats.finish(1, False)
         return None, None
 
-    def visualize_graph(self):
-        """Visualize the graph using networkx."""
-        G = nx.Graph()
-        for node in self.graph:
-            for neighbor, weight in self.graph[node]:
-                G.add_edge(node, neighbor, weight=weight)
-        
-        pos = nx.spring_layout(G)
-        plt.figure(figsize=(10, 8))
-        nx.draw(G, pos, with_labels=True, node_color='lightblue', 
-                node_size=500, font_size=12, font_weight='bold')
-        
-        edge_labels = nx.get_edge_attributes(G, 'weight')
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
-        
-        plt.title("Graph Visualization")
-        plt.show()
+    def k_shortest_paths(self, start, goal, k=None):
+        """Yield loopless start -> goal paths as (path, cost) in increasing cost (Yen's algorithm).
+
+        Paths are produced lazily, so a caller pays only for the ones it takes;
+        k caps how many are yielded (k <= 0 yields none). One reverse shortest-path tree to goal is
+        built up front and reused by every spur search: its distances are an
+        exact heuristic (edge removals only lengthen paths), and when the
+        tree's own route from the spur node avoids the removed nodes and edges,
+        it is the spur path and no search runs at all.
+        """
+        g = self.graph
+        start_id, goal_id = g.index[start], g.index[goal]
+        if k is not None and k <= 0:
+            return
+        to_goal, next_hop = shortest_path_tree(self.reverse_graph, goal_id)
+        if to_goal[start_id] == float("inf"):
+            return
+
+        def tree_path(node):
+            path = [node]
+            while node != goal_id:
+                node = next_hop[node]
+                path.append(node)
+            return path
+
+        def path_cost(path):
+            return sum(g.weight(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+        first = tree_path(start_id)
+        found = [first]
+        costs = [path_cost(first)]
+        candidates = []  # heap of (cost, tie-breaker, path)
+        seen = {tuple(first)}
+        counter = 0
+        yield [g.names[node] for node in first], costs[0]
+
+        while k is None or len(found) < k:
+            last = found[-1]
+            root_cost = 0
+            for i in range(len(last) - 1):
+                spur = last[i]
+                root = last[:i + 1]
+                blocked_targets = {path[i + 1] for path in found
+                                   if len(path) > i + 1 and path[:i + 1] == root}
+                blocked_nodes = set(root[:-1])
+
+                spur_path = None
+                if to_goal[spur] != float("inf") and next_hop[spur] not in blocked_targets:
+                    route = tree_path(spur)
+                    if blocked_nodes.isdisjoint(route):
+                        spur_path = route
+                if spur_path is None:
+                    spur_path = self._spur_search(spur, goal_id, to_goal, blocked_nodes, blocked_targets)
+
+                if spur_path is not None:
+                    candidate = root[:-1] + spur_path
+                    key = tuple(candidate)
+                    if key not in seen:
+                        seen.add(key)
+                        counter += 1
+                        cost = root_cost + path_cost(spur_path)
+                        heapq.heappush(candidates, (cost, counter, candidate))
+                root_cost += g.weight(last[i], last[i + 1])
+
+            if not candidates:
+                return
+            cost, _, path = heapq.heappop(candidates)
+            found.append(path)
+            costs.append(cost)
+            yield [g.names[node] for node in path], cost
+
+    def _spur_search(self, spur, goal_id, h, blocked_nodes, blocked_targets):
+        """A* from spur to goal avoiding blocked_nodes and the spur -> blocked_targets edges."""
+        g = self.graph
+        offsets, targets, weights = g.offsets, g.targets, g.weights
+        came_from = {spur: -1}
+        g_score = {spur: 0}
+        visited = set()
+        open_set = [(h[spur], spur)]
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current == goal_id:
+                path = []
+                while current != -1:
+                    path.append(current)
+                    current = came_from[current]
+                path.reverse()
+                return path
+            if current in visited:
+                continue
+            visited.add(current)
+
+            for e in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                if neighbor in visited or neighbor in blocked_nodes:
+                    continue
+                if current == spur and neighbor in blocked_targets:
+                    continue
+                tentative_g_score = g_score[current] + weights[e]
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(open_set, (tentative_g_score + h[neighbor], neighbor))
+        return None
+
+    def time_dependent_a_star(self, start, goal, departure):
+        """A* on travel-time profiles: each edge is costed at the time the search reaches it.
+
+        Returns (path, travel_time). The heuristic is ALT over each edge's minimum
+        travel time, which stays admissible for any departure time.
+        """
+        profiles = self.travel_time_profiles
+        if profiles is None:
+            raise ValueError("no travel-time profiles set; call set_travel_time_profiles first")
+        g = self.graph
+        if self._time_dependent_heuristic is None:
+            lower = profiles.lower_bound_graph()
+            self._time_dependent_heuristic = LandmarkHeuristic.build(lower, lower.reversed())
+        offsets, targets = g.offsets, g.targets
+        travel_time = profiles.travel_time
+        start_id, goal_id = g.index[start], g.index[goal]
+        h = self._time_dependent_heuristic.bound_to(goal_id)
+        visited = set()
+        came_from = {start_id: -1}
+        arrival = {start_id: departure}
+
+        open_set = [(departure + h[start_id], start_id)]
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = heapq.heappush, heapq.heappop, range
+        else:
+            push, pop, edge_range = stats.heap_ops()
+
+        while open_set:
+            current = pop(open_set)[1]
+            if current in visited:
+                continue
+
+            if current == goal_id:
+                if stats is not None:
+                    stats.finish(1, True)
+                return self._to_names(came_from, goal_id), arrival[goal_id] - departure
+
+            visited.add(current)
+            now = arrival[current]
+
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                if neighbor in visited:
+                    continue
+
+                tentative_arrival = now + travel_time(e, now)
+
+                if neighbor not in arrival or tentative_arrival < arrival[neighbor]:
+                    came_from[neighbor] = current
+                    arrival[neighbor] = tentative_arrival
+                    push(open_set, (tentative_arrival + h[neighbor], neighbor))
+
+        if stats is not None:
+            stats.finish(1, False)
+        return None, None
+
+    def bidirectional_search(self, start, goal):
+        """Bidirectional Dijkstra: search forward from start and backward from goal at once."""
+        g = self.graph
+        start_id, goal_id = g.index[start], g.index[goal]
+        if start_id == goal_id:
+            return [start], 0
+
+        graphs = (g, self.reverse_graph)
+        dist = ({start_id: 0}, {goal_id: 0})
+        parent = ({start_id: -1}, {goal_id: -1})
+        heaps = ([(0, start_id)], [(0, goal_id)])
+        settled = (set(), set())
+        best_cost = float("inf")
+        meeting = -1
+        stats = self._begin_search()
+        if stats is None:
+            push, pop, edge_range = heapq.heappush, heapq.heappop, range
+        else:
+            push, pop, edge_range = stats.heap_ops()
+
+        while heaps[0] and heaps[1]:
+            # once the two frontier minima add up to the best meeting cost, no
+            # unexplored path can beat it
+            if heaps[0][0][0] + heaps[1][0][0] >= best_cost:
+                break
+
+            # expand the side with the smaller frontier key
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, current = pop(heaps[side])
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+
+            graph = graphs[side]
+            offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+            own_dist, own_parent, other_dist = dist[side], parent[side], dist[1 - side]
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                new_dist = d + weights[e]
+                if neighbor not in own_dist or new_dist < own_dist[neighbor]:
+                    own_dist[neighbor] = new_dist
+                    own_parent[neighbor] = current
+                    push(heaps[side], (new_dist, neighbor))
+                if neighbor in other_dist:
+                    total = own_dist[neighbor] + other_dist[neighbor]
+                    if total < best_cost:
+                        best_cost = total
+                        meeting = neighbor
+
+        if stats is not None:
+            stats.finish(2, False)
+        if meeting == -1:
+            return None, None
+
+        # splice the forward half (start..meeting) with the backward half (meeting..goal)
+        path = self._to_names(parent[0], meeting)
+        current = parent[1][meeting]
+        while current != -1:
+            path.append(g.names[current])
+            current = parent[1][current]
+        return path, best_cost
+
+    def layout(self, cache_file=None):
+        """(n, 2) array of drawing positions by node id.
+
+        Stored coordinates are used when set (see set_coordinates). Otherwise a
+        seeded spring layout is computed once and cached on the PathFinder, and
+        in cache_file (.npy) when given, so later renders skip it.
+        """
+        if self.coordinates is not None:
+            xs, ys = self.coordinates
+            return np.column_stack((np.asarray(xs), np.asarray(ys)))
+        if self._layout is None and cache_file is not None and os.path.exists(cache_file):
+            self._layout = np.load(cache_file)
+        if self._layout is None:
+            import networkx as nx
+
+            g = self.graph
+            G = nx.Graph()
+            G.add_nodes_from(range(g.num_nodes))
+            sources = np.repeat(np.arange(g.num_nodes), np.diff(np.asarray(g.offsets)))
+            G.add_edges_from(zip(sources.tolist(), np.asarray(g.targets).tolist()))
+            pos = nx.spring_layout(G, seed=0)
+            self._layout = np.array([pos[i] for i in range(g.num_nodes)])
+            if cache_file is not None:
+                np.save(cache_file, self._layout)
+        return self._layout
+
+    def visualize_graph(self, output=None, max_labels=100, layout_cache=None):
+        """Visualize the graph; with output, save the image to that file instead of showing it.
+
+        Edges are drawn as one LineCollection and nodes as one scatter, so
+        large networks render quickly. Only the max_labels highest-degree nodes
+        are labelled, and edge weights are shown only when there are at most
+        max_labels roads.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        g = self.graph
+        pos = self.layout(layout_cache)
+        offsets = np.asarray(g.offsets)
+        degree = np.diff(offsets)
+        sources = np.repeat(np.arange(g.num_nodes), degree)
+        targets = np.asarray(g.targets)
+        weights = np.asarray(g.weights)
+        # draw each two-way road once
+        pairs, first = np.unique(np.column_stack((np.minimum(sources, targets),
+                                                  np.maximum(sources, targets))),
+                                 axis=0, return_index=True)
+        segments = pos[pairs]
+
+        if output is None:
+            fig = plt.figure(figsize=(10, 8))
+        else:
+            # no pyplot figure manager, so this works without a display
+            fig = Figure(figsize=(10, 8))
+        ax = fig.add_subplot()
+        small = g.num_nodes <= max_labels
+        ax.add_collection(LineCollection(segments, colors="gray", linewidths=1.0 if small else 0.3,
+                                         zorder=1))
+        ax.scatter(pos[:, 0], pos[:, 1], s=500 if small else max(1.0, 2000 / g.num_nodes),
+                   c="lightblue", zorder=2)
+
+        labelled = np.argsort(-degree, kind="stable")[:max_labels]
+        for node in labelled:
+            ax.annotate(g.names[node], pos[node], ha="center", va="center",
+                        fontsize=12 if small else 6, fontweight="bold", zorder=3)
+        if len(pairs) <= max_labels:
+            for (u, v), w in zip(segments.mean(axis=1), weights[first]):
+                ax.annotate(str(w), (u, v), ha="center", va="center", fontsize=9,
+                            bbox=dict(boxstyle="round", fc="white", ec="none"), zorder=3)
+
+        ax.autoscale_view()
+        ax.set_axis_off()
+        ax.set_title("Graph Visualization")
+        if output is None:
+            plt.show()
+        else:
+            fig.savefig(output, dpi=150)
+        return fig
+
 
+def dijkstra_distances(graph, source):
+    """Shortest distances from node id source to every node id of a CSRGraph (inf if unreachable)."""
+    return shortest_path_tree(graph, source)[0]
+
+def shortest_path_tree(graph, source):
+    """Dijkstra from node id source: (distances, parents) with inf distances for unreachable nodes.
+
+    parents[n] is the node before n on its shortest path (-1 for none).
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = array("d", [float("inf")]) * graph.num_nodes
+    parents = array("q", [-1]) * graph.num_nodes
+    distances[source] = 0
+    queue = [(0, source)]
+
+    while queue:
+        dist, current = heapq.heappop(queue)
+
+        if dist > distances[current]:
+            continue
+
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            distance = dist + weights[e]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heapq.heappush(queue, (distance, neighbor))
+
+    return distances, parents
+
+GRAPH_FILE_MAGIC = b"RGRAPH01"
+# magic, node count, edge count, weight kind (0 = int64, 1 = float64), name byte count
+_GRAPH_FILE_HEADER = struct.Struct("<8sqqqq")
+
+
+class NameTable:
+    """Node names stored as one UTF-8 blob plus an offsets array, decoded on access."""
+
+    def __init__(self, name_offsets, name_bytes):
+        self.name_offsets = name_offsets
+        self.name_bytes = name_bytes
+
+    def __len__(self):
+        return len(self.name_offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.name_bytes[self.name_offsets[i]:self.name_offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class NameIndex:
+    """Name -> id lookup by binary search over ids sorted by name, so opening needs no dict."""
+
+    def __init__(self, names, sorted_ids):
+        self.names = names
+        self.sorted_ids = sorted_ids
+
+    def get(self, name, default=None):
+        names, sorted_ids = self.names, self.sorted_ids
+        lo, hi = 0, len(sorted_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if names[sorted_ids[mid]] < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(sorted_ids) and names[sorted_ids[lo]] == name:
+            return int(sorted_ids[lo])
+        return default
+
+    def __getitem__(self, name):
+        node = self.get(name)
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+
+def write_graph_file(csv_path, out_path):
+    """Convert an edge-list CSV (source,target,weight per row, optional header) to a graph file.
+
+    Layout after the header, each section padded to 8 bytes: offsets int64[n + 1],
+    targets int64[m], weights int64 or float64[m], name offsets int64[n + 1],
+    ids sorted by name int64[n], then the UTF-8 name bytes.
+    """
+    index = {}
+    names = []
+    sources, targets, weights = array("q"), array("q"), []
+    with open(csv_path, newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        first = True
+        for row in reader:
+            if not row or row[0].startswith("#"):
+                continue
+            if len(row) < 3:
+                raise ValueError(f"{csv_path}, line {reader.line_num}: expected source,target,weight")
+            source, target, weight = row[0].strip(), row[1].strip(), row[2].strip()
+            try:
+                weight = int(weight)
+            except ValueError:
+                try:
+                    weight = float(weight)
+                except ValueError:
+                    if first:
+                        first = False
+                        continue  # header row
+                    raise ValueError(f"{csv_path}, line {reader.line_num}: bad weight {weight!r}") from None
+            first = False
+            for name in (source, target):
+                if name not in index:
+                    index[name] = len(names)
+                    names.append(name)
+            sources.append(index[source])
+            targets.append(index[target])
+            weights.append(weight)
+
+    is_float = any(isinstance(w, float) for w in weights)
+    graph = CSRGraph.from_edges(names, sources, targets, weights, "d" if is_float else "q")
+
+    encoded = [name.encode("utf-8") for name in names]
+    name_offsets = array("q", [0])
+    for raw in encoded:
+        name_offsets.append(name_offsets[-1] + len(raw))
+    sorted_ids = array("q", sorted(range(len(names)), key=encoded.__getitem__))
+    name_bytes = b"".join(encoded)
+
+    with open(out_path, "wb") as f:
+        f.write(_GRAPH_FILE_HEADER.pack(GRAPH_FILE_MAGIC, graph.num_nodes, graph.num_edges,
+                                        1 if is_float else 0, len(name_bytes)))
+        for section in (graph.offsets, graph.targets, graph.weights, name_offsets, sorted_ids):
+            f.write(section.tobytes())
+        f.write(name_bytes)
+    return graph
+
+
+def load_graph_file(path):
+    """Open a graph file as a CSRGraph whose arrays are read-only numpy.memmap views.
+
+    Nothing is copied or parsed, so opening is fast and processes that load the
+    same file share its pages. Edge weights cannot be changed on such a graph.
+    """
+    with open(path, "rb") as f:
+        magic, n, m, weight_kind, name_byte_count = _GRAPH_FILE_HEADER.unpack(
+            f.read(_GRAPH_FILE_HEADER.size))
+    if magic != GRAPH_FILE_MAGIC:
+        raise ValueError(f"{path} is not a road graph file")
+
+    position = _GRAPH_FILE_HEADER.size
+
+    def section(dtype, count):
+        nonlocal position
+        view = np.memmap(path, dtype=dtype, mode="r", offset=position, shape=(count,))
+        position += np.dtype(dtype).itemsize * count
+        return view
+
+    offsets = section(np.int64, n + 1)
+    targets = section(np.int64, m)
+    weights = section(np.float64 if weight_kind else np.int64, m)
+    name_offsets = section(np.int64, n + 1)
+    sorted_ids = section(np.int64, n)
+    name_bytes = section(np.uint8, name_byte_count) if name_byte_count else b""
+
+    names = NameTable(name_offsets, name_bytes)
+    graph = CSRGraph(names, offsets, targets, weights, NameIndex(names, sorted_ids))
+    graph.source_file = path
+    return graph
+
+
+def _share_array(values):
+    """Copy an array into a new shared memory block; return it with a spec workers can attach to."""
+    nbytes = values.itemsize * len(values)
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    shm.buf[:nbytes] = memoryview(values).cast("B")
+    return shm, (shm.name, values.typecode, len(values))
+
+def _attach_array(spec, blocks):
+    """Map a shared array spec from _share_array back to a typed memoryview."""
+    name, typecode, length = spec
+    shm = shared_memory.SharedMemory(name=name)
+    blocks.append(shm)
+    return shm.buf[:length * array(typecode).itemsize].cast(typecode)
+
+def _chunked(pairs, chunk_size):
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _one_to_many(graph, source, target_ids):
+    """Dijkstra from node id source, stopping once every id in target_ids is settled."""
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    remaining = set(target_ids)
+    distances = {source: 0}
+    queue = [(0, source)]
+
+    while queue and remaining:
+        dist, current = heapq.heappop(queue)
+
+        if dist > distances[current]:
+            continue
+        remaining.discard(current)
+
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            distance = dist + weights[e]
+            if neighbor not in distances or distance < distances[neighbor]:
+                distances[neighbor] = distance
+                heapq.heappush(queue, (distance, neighbor))
+
+    # every target is settled now, or the queue ran dry and it is unreachable
+    inf = float("inf")
+    return [distances.get(target, inf) for target in target_ids]
+
+def _bounded_dijkstra(graph, source, limit):
+    """Dijkstra from node id source that never goes past cost limit.
+
+    Only nodes within the limit are stored or pushed, so the work is
+    proportional to the reachable region. Returns (ids, costs) NumPy arrays in
+    settle order, i.e. sorted by cost.
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = {source: 0}
+    settled_ids, settled_costs = array("q"), array("d")
+    queue = [(0, source)]
+
+    while queue:
+        dist, current = heapq.heappop(queue)
+
+        if dist > distances[current]:
+            continue
+        settled_ids.append(current)
+        settled_costs.append(dist)
+
+        for e in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[e]
+            distance = dist + weights[e]
+            if distance <= limit and (neighbor not in distances or distance < distances[neighbor]):
+                distances[neighbor] = distance
+                heapq.heappush(queue, (distance, neighbor))
+
+    return np.frombuffer(settled_ids, dtype=np.int64), np.frombuffer(settled_costs, dtype=np.float64)
+
+# per-process state of pool workers, set once by _init_batch_worker
+_batch_blocks = []
+_batch_pathfinder = None
+
+def _init_batch_worker(graph_specs, heuristic_spec):
+    global _batch_pathfinder
+    if graph_specs[0] == "file":
+        graph = load_graph_file(graph_specs[1])
+    else:
+        _, names, array_specs = graph_specs
+        offsets, targets, weights = (_attach_array(spec, _batch_blocks) for spec in array_specs)
+        graph = CSRGraph(names, offsets, targets, weights)
+    pathfinder = PathFinder(graph)
+    if heuristic_spec is not None and heuristic_spec[0] == "landmarks":
+        _, landmarks, from_specs, to_specs = heuristic_spec
+        pathfinder.heuristic = LandmarkHeuristic(
+            landmarks,
+            [_attach_array(spec, _batch_blocks) for spec in from_specs],
+            [_attach_array(spec, _batch_blocks) for spec in to_specs])
+    elif heuristic_spec is not None and heuristic_spec[0] == "cache":
+        pathfinder.enable_heuristic_cache(heuristic_spec[1])
+    elif heuristic_spec is not None and heuristic_spec[0] == "coordinates":
+        _, xs_spec, ys_spec, metric, scale = heuristic_spec
+        pathfinder.heuristic = CoordinateHeuristic(
+            _attach_array(xs_spec, _batch_blocks), _attach_array(ys_spec, _batch_blocks), metric, scale)
+    _batch_pathfinder = pathfinder
+
+def _tagged_search(search, index, start, goal):
+    """(start, goal, path, cost, error) for one pair; unknown locations become an error."""
+    for node in (start, goal):
+        if node not in index:
+            return start, goal, None, None, f"unknown location {node!r}"
+    path, cost = search(start, goal)
+    return start, goal, path, cost, None
+
+def _solve_chunk(task):
+    algorithm, chunk, tagged = task
+    search = getattr(_batch_pathfinder, algorithm)
+    if tagged:
+        index = _batch_pathfinder.graph.index
+        return [_tagged_search(search, index, start, goal) for start, goal in chunk]
+    return [search(start, goal) for start, goal in chunk]
+
+def _distance_row(task):
+    source, target_ids = task
+    return _one_to_many(_batch_pathfinder.graph, source, target_ids)
+
+def _isochrone_task(task):
+    source, limit, reverse = task
+    graph = _batch_pathfinder.reverse_graph if reverse else _batch_pathfinder.graph
+    return _bounded_dijkstra(graph, source, limit)
+
+def benchmark_replanning(pathfinder, start, goal, updates):
+    """Time LPA* repair against a full a_star re-search after each (u, v, weight) update.
+
+    The update itself is timed as its own column. Full search time includes
+    any heuristic rebuild the update left for the next search to do.
+    """
+    import pandas as pd
+
+    route = pathfinder.open_dynamic_route(start, goal)
+    results = []
+    try:
+        for u, v, weight in updates:
+            start_time = time.perf_counter()
+            pathfinder.update_edge_weight(u, v, weight)
+            update_time = time.perf_counter() - start_time
+
+            expansions_before = route.expansions
+            start_time = time.perf_counter()
+            path, cost = route.compute()
+            repair_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            _, full_cost = pathfinder.a_star(start, goal)
+            full_time = time.perf_counter() - start_time
+
+            results.append({
+                "Edge": f"{u}->{v}",
+                "Weight": weight,
+                "Cost": cost if cost is not None else "N/A",
+                "Matches A*": cost == full_cost,
+                "Repair Expansions": route.expansions - expansions_before,
+                "Update Time (ms)": round(update_time * 1000, 6),
+                "Repair Time (ms)": round(repair_time * 1000, 6),
+                "Full Search Time (ms)": round(full_time * 1000, 6)
+            })
+    finally:
+        pathfinder.close_dynamic_route(route)
+    return pd.DataFrame(results)
 
 def calculate_realistic_heuristic(graph, goal):
     """Calculate more realistic heuristic values using shortest path distances."""
@@ -201,21 +2207,20 @@ def calculate_realistic_heuristic(graph, goal):
     
     return distances
 
-def main():
-    # Define the graph
-    graph = {
-        "WL": [("Y", 1), ("PG", 6), ("YCK", 4)],
-        "Y": [("WL", 1), ("YCK", 2)],
-        "PG": [("WL", 6), ("PS", 2)],
-        "YCK": [("WL", 4), ("Y", 2), ("PG", 5), ("TP", 3)],
-        "TP": [("YCK", 3), ("CA", 1)],
-        "PS": [("PG", 2), ("YCK", 5), ("CA", 2)],
-        "CA": [("PS", 2), ("TP", 1)]
-    }
+# Sample road network used by main() and as the default for route_service.py
+SAMPLE_GRAPH = {
+    "WL": [("Y", 1), ("PG", 6), ("YCK", 4)],
+    "Y": [("WL", 1), ("YCK", 2)],
+    "PG": [("WL", 6), ("PS", 2)],
+    "YCK": [("WL", 4), ("Y", 2), ("PG", 5), ("TP", 3)],
+    "TP": [("YCK", 3), ("CA", 1)],
+    "PS": [("PG", 2), ("YCK", 5), ("CA", 2)],
+    "CA": [("PS", 2), ("TP", 1)]
+}
+
+def interactive_menu(pathfinder):
+    graph = pathfinder.graph
 
-    # Create PathFinder instance
-    pathfinder = PathFinder(graph)
-    
     while True:
         print("\n=== Pathfinding Algorithm Testing ===")
         print("\nAvailable locations:", ", ".join(sorted(graph.keys())))
@@ -241,9 +2246,7 @@ def main():
                     break
                 print("Invalid location! Please choose from available locations.")
             
-            # Calculate heuristic and run comparison
-            heuristic = calculate_realistic_heuristic(graph, goal)
-            pathfinder.heuristic = heuristic
+            # Run comparison
             results_df = pathfinder.compare_algorithms_with_accuracy(start, goal)
             
             print("\nResults:")
@@ -255,8 +2258,9 @@ def main():
             print("2. Depth-First Search (DFS)")
             print("3. Greedy Best-First Search (GBFS)")
             print("4. A* Search")
+            print("5. Bidirectional Dijkstra")
             
-            algo_choice = input("\nEnter algorithm number (1-4): ")
+            algo_choice = input("\nEnter algorithm number (1-5): ")
 
             start = input("\nEnter starting location: ").upper()
             goal = input("Enter destination location: ").upper()
@@ -265,14 +2269,12 @@ def main():
                 print("Invalid locations. Please try again.")
                 continue
 
-            heuristic = calculate_realistic_heuristic(graph, goal)
-            pathfinder.heuristic = heuristic
-
             # Run selected algorithm
             algo_mapping = {"1": ("BFS", pathfinder.bfs),
                             "2": ("DFS", pathfinder.dfs),
                             "3": ("GBFS", pathfinder.gbfs),
-                            "4": ("A*", pathfinder.a_star)}
+                            "4": ("A*", pathfinder.a_star),
+                            "5": ("Bi-Dijkstra", pathfinder.bidirectional_search)}
 
             if algo_choice in algo_mapping:
                 algo_name, algo_func = algo_mapping[algo_choice]
@@ -297,5 +2299,95 @@ def main():
         else:
             print("\nInvalid choice! Please enter a number between 1 and 4.")
 
+# PathFinder searches callable by name from batch runs, the benchmark and the route service
+ALGORITHMS = ["bfs", "dfs", "gbfs", "a_star", "bidirectional_search"]
+
+def read_queries(path):
+    """Yield (start, goal) pairs from a CSV (start,goal columns, header optional) or JSON lines file.
+
+    path "-" reads CSV from stdin. Lines are read lazily, so large query files
+    are never held in memory.
+    """
+    f = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    query = json.loads(line)
+                    yield query["start"], query["goal"]
+            return
+        rows = csv.reader(f)
+        for row in rows:
+            if not row or row[0].startswith("#"):
+                continue
+            if [cell.strip().lower() for cell in row[:2]] == ["start", "goal"]:
+                continue  # header
+            yield row[0].strip(), row[1].strip()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def run_batch(pathfinder, pairs, out, output_format="csv", algorithm="a_star", workers=1):
+    """Solve pairs with one PathFinder and stream one result per pair to out, in input order.
+
+    Unknown locations produce an error record instead of stopping the run.
+    Returns the number of queries written.
+    """
+    # pairs are read once; unknown locations come back as error records in their place
+    results = pathfinder.solve_many(pairs, workers=workers, algorithm=algorithm, tagged=True)
+
+    writer = None
+    if output_format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(["start", "goal", "cost", "path", "error"])
+    count = 0
+    for start, goal, path, cost, error in results:
+        if error is None and not path:
+            error = "no path"
+        if hasattr(cost, "item"):
+            cost = cost.item()  # NumPy scalar from a memory-mapped graph
+        if writer is not None:
+            writer.writerow([start, goal, "" if cost is None else cost,
+                             " -> ".join(path) if path else "", error or ""])
+        else:
+            out.write(json.dumps({"start": start, "goal": goal, "cost": cost,
+                                  "path": path, "error": error}) + "\n")
+        count += 1
+    out.flush()
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Route planning. Without --queries, starts the interactive menu.")
+    parser.add_argument("--graph", help="binary graph file from write_graph_file (default: sample graph)")
+    parser.add_argument("--queries", help="CSV or .jsonl file of start/goal pairs; - for stdin")
+    parser.add_argument("--output", default="-", help="results file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="a_star")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--landmarks", type=int, default=4, help="ALT landmarks (0 for none)")
+    args = parser.parse_args(argv)
+
+    # Create PathFinder instance; landmark bounds are precomputed once for every goal
+    pathfinder = PathFinder.from_file(args.graph) if args.graph else PathFinder(SAMPLE_GRAPH)
+    if args.landmarks:
+        pathfinder.build_landmark_heuristic(args.landmarks)
+
+    if args.queries is None:
+        interactive_menu(pathfinder)
+        return
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        start_time = time.perf_counter()
+        count = run_batch(pathfinder, read_queries(args.queries), out, args.format,
+                          args.algorithm, args.workers)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{count} queries in {elapsed:.3f} s ({count / elapsed if elapsed else 0:.1f} queries/s)",
+          file=sys.stderr)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
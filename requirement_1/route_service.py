@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from requirement1 import ALGORITHMS, SAMPLE_GRAPH, PathFinder, _solve_chunk
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _json_scalar(value):
+    # costs from memory-mapped graphs are NumPy scalars
+    return value.item()
+
+
+class RouteService:
+    """Asyncio front end that coalesces and micro-batches route queries.
+
+    Identical in-flight (algorithm, start, goal) queries share one future.
+    New queries wait up to batch_window seconds (or until max_batch are
+    queued) and are then solved together: on one background thread when
+    workers <= 1, otherwise split into chunks of at most chunk_size across
+    the PathFinder's shared-memory process pool.
+    """
+
+    def __init__(self, pathfinder, workers=1, batch_window=0.002, max_batch=256,
+                 chunk_size=16, latency_window=10000):
+        self.pathfinder = pathfinder
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_queries = 0
+        self._in_flight = {}
+        self._pending = []
+        self._flush_handle = None
+        self._stack = ExitStack()
+        self._pool = None
+        self._executor = None
+
+    def start(self):
+        if self.workers > 1:
+            self._pool = self._stack.enter_context(self.pathfinder._shared_pool(self.workers))
+        else:
+            self._executor = self._stack.enter_context(ThreadPoolExecutor(1))
+
+    def close(self):
+        self._stack.close()
+
+    async def query(self, start, goal, algorithm="a_star"):
+        """(path, cost) for one query; unreachable goals give (None, None)."""
+        index = self.pathfinder.graph.index
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}")
+        for node in (start, goal):
+            if node not in index:
+                raise KeyError(f"unknown location {node!r}")
+
+        self.requests += 1
+        key = (algorithm, start, goal)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._pending.append(key)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        by_algorithm = {}
+        for key in pending:
+            by_algorithm.setdefault(key[0], []).append(key)
+        for algorithm, keys in by_algorithm.items():
+            self.batches += 1
+            self.batched_queries += len(keys)
+            if self._pool is None:
+                self._dispatch_thread(algorithm, keys)
+                continue
+            # split the batch so every worker gets a share
+            size = max(1, min(self.chunk_size, -(-len(keys) // self.workers)))
+            for i in range(0, len(keys), size):
+                self._dispatch_pool(algorithm, keys[i:i + size])
+
+    def _resolve(self, key, result=None, error=None):
+        future = self._in_flight.pop(key)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _dispatch_pool(self, algorithm, keys):
+        loop = asyncio.get_running_loop()
+
+        def resolve(results):
+            for key, result in zip(keys, results):
+                self._resolve(key, result)
+
+        def fail(error):
+            for key in keys:
+                self._resolve(key, error=error)
+
+        # pool callbacks run on its result thread, so hop back onto the loop
+        self._pool.apply_async(
+            _solve_chunk, ((algorithm, [(start, goal) for _, start, goal in keys], False),),
+            callback=lambda results: loop.call_soon_threadsafe(resolve, results),
+            error_callback=lambda error: loop.call_soon_threadsafe(fail, error))
+
+    def _dispatch_thread(self, algorithm, keys):
+        loop = asyncio.get_running_loop()
+        search = getattr(self.pathfinder, algorithm)
+
+        def solve():
+            # answer each query as soon as it is solved rather than with the whole batch
+            for key in keys:
+                try:
+                    result = search(key[1], key[2])
+                except Exception as error:
+                    loop.call_soon_threadsafe(self._resolve, key, None, error)
+                else:
+                    loop.call_soon_threadsafe(self._resolve, key, result)
+
+        loop.run_in_executor(self._executor, solve)
+
+    async def handle(self, request):
+        """Answer one decoded JSON request with a JSON-ready dict."""
+        received = time.perf_counter()
+        if request.get("op") == "stats":
+            return {"id": request.get("id"), "stats": self.stats()}
+        for field in ("start", "goal"):
+            if field not in request:
+                return {"id": request.get("id"), "error": f"missing field {field!r}"}
+        try:
+            path, cost = await self.query(request["start"], request["goal"],
+                                          request.get("algorithm", "a_star"))
+        except (KeyError, ValueError) as error:
+            return {"id": request.get("id"), "error": error.args[0]}
+        latency = time.perf_counter() - received
+        self.latencies.append(latency)
+        return {"id": request.get("id"), "path": path, "cost": cost,
+                "latency_ms": latency * 1000}
+
+    def stats(self):
+        """Request counters and p50/p90/p99 latency over the recent window, in ms."""
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "mean_batch": self.batched_queries / self.batches if self.batches else 0.0,
+            **{f"p{p}_ms": None if not latencies else percentile(latencies, p) * 1000
+               for p in (50, 90, 99)},
+        }
+
+    async def _answer(self, line, write):
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as error:
+            response = {"error": f"bad request: {error}"}
+        else:
+            response = await self.handle(request)
+        write(json.dumps(response, default=_json_scalar) + "\n")
+
+    async def _serve_lines(self, reader, write):
+        # each line is answered as soon as it is ready, so responses may come back out of order
+        tasks = set()
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            task = asyncio.create_task(self._answer(line, write))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _on_connection(self, reader, writer):
+        try:
+            await self._serve_lines(reader, lambda text: writer.write(text.encode()))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self._on_connection, host, port)
+
+    async def serve_unix(self, path):
+        return await asyncio.start_unix_server(self._on_connection, path)
+
+    async def serve_stdin(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        await self._serve_lines(reader, write)
+
+
+async def stand_in_client(host, port, pairs, algorithm="a_star"):
+    """Send every pair over one connection at once and return the responses in request order."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for i, (start, goal) in enumerate(pairs):
+        writer.write((json.dumps({"id": i, "start": start, "goal": goal,
+                                  "algorithm": algorithm}) + "\n").encode())
+    await writer.drain()
+    writer.write_eof()
+
+    responses = {}
+    while line := await reader.readline():
+        response = json.loads(line)
+        responses[response["id"]] = response
+    writer.close()
+    return [responses[i] for i in range(len(pairs))]
+
+
+async def run_demo(service, queries, clients, seed=0):
+    """Serve on an ephemeral local port and replay seeded queries (with repeats) from several clients."""
+    server = await service.serve_tcp(port=0)
+    port = server.sockets[0].getsockname()[1]
+    rng = random.Random(seed)
+    names = list(service.pathfinder.graph.names)
+    hot = [(rng.choice(names), rng.choice(names)) for _ in range(max(1, queries // 10))]
+    pairs = [rng.choice(hot) for _ in range(queries)]
+    share = -(-len(pairs) // clients)
+    async with server:
+        await asyncio.gather(*(stand_in_client("127.0.0.1", port, pairs[i:i + share])
+                               for i in range(0, len(pairs), share)))
+    return service.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PathFinder route queries as JSON lines.")
+    parser.add_argument("--graph", help="binary graph file from write_graph_file (default: sample graph)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this unix socket path instead of TCP")
+    parser.add_argument("--stdin", action="store_true", help="read requests from stdin, answer on stdout")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--landmarks", type=int, default=4, help="ALT landmarks (0 for none)")
+    parser.add_argument("--demo", type=int, metavar="N", help="replay N local test queries and print stats")
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+
+    pathfinder = PathFinder.from_file(args.graph) if args.graph else PathFinder(SAMPLE_GRAPH)
+    if args.landmarks:
+        pathfinder.build_landmark_heuristic(args.landmarks)
+    service = RouteService(pathfinder, args.workers, args.batch_window_ms / 1000, args.max_batch)
+
+    async def run():
+        if args.demo:
+            print(json.dumps(await run_demo(service, args.demo, args.clients)))
+        elif args.stdin:
+            await service.serve_stdin()
+        else:
+            server = await (service.serve_unix(args.unix) if args.unix
+                            else service.serve_tcp(args.host, args.port))
+            async with server:
+                await server.serve_forever()
+
+    service.start()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
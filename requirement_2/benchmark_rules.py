@@ -0,0 +1,98 @@
+import argparse
+import random
+import time
+
+import logic
+import requirement2
+from requirement2 import build_kb, compile_rules, evaluate_vehicle, get_traffic_rules, resolution_inference
+
+LOCATIONS = ["Tuas Expressway", "Orchard Road", "CBD", "School Street", "City Link",
+             "Jurong East", "Changi Airport", "Bukit Timah"]
+ZONE_TYPES = {"Tuas Expressway": "expressway", "City Link": "residential"}
+
+
+def synthetic_vehicles(count, seed=0):
+    """Yield count seeded vehicle records shaped like load_vehicle_data output."""
+    rng = random.Random(seed)
+    for i in range(count):
+        location = rng.choice(LOCATIONS)
+        yield {
+            "vehicle_id": f"SG{i:07d}",
+            "speed": float(rng.randint(0, 160)),
+            "traffic_light": rng.choice(["red", "green", "yellow"]),
+            "is_bus": rng.random() < 0.1,
+            "parked_duration": float(rng.choice([0, 0, 0, 3, 10])),
+            "erp_active": rng.random() < 0.5,
+            "erp_balance": float(rng.randint(0, 10)),
+            "charge_amount": float(rng.randint(0, 5)),
+            "school_zone": location == "School Street",
+            "location": location,
+            "zone_type": ZONE_TYPES.get(location, "urban"),
+            "timestamp": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "made_uturn": rng.random() < 0.05,
+        }
+
+
+def legacy_evaluate_vehicle(vehicle, rules_by_location):
+    """evaluate_vehicle before rule compilation: parse each CNF string and prove on a KB copy."""
+    violations = []
+    kb = build_kb(vehicle)
+    vehicle_loc = vehicle["location"].strip()
+    applicable_rules = rules_by_location.get(vehicle_loc, []) + rules_by_location.get("ALL", [])
+    for violation, description, cnf_clause in applicable_rules:
+        literals = []
+        for lit in cnf_clause.strip("()").split("OR"):
+            lit = lit.strip()
+            if lit.startswith("~"):
+                literals.append(logic.Not(logic.Symbol(lit[1:])))
+            else:
+                literals.append(logic.Symbol(lit))
+        rule_clause = literals[0] if len(literals) == 1 else logic.Or(*literals)
+        kb_with_rule = kb.copy()
+        kb_with_rule.add(rule_clause)
+        if resolution_inference(kb_with_rule, logic.Symbol(violation), backend="resolution"):
+            violations.append(violation)
+    return list(set(violations))
+
+
+def time_rows(evaluate, vehicles):
+    start_time = time.perf_counter()
+    flagged = 0
+    for vehicle in vehicles:
+        flagged += bool(evaluate(vehicle))
+    return time.perf_counter() - start_time, flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time compiled rule plans against the legacy evaluation.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--legacy-rows", type=int, default=20000,
+                        help="rows for the slow legacy path; its rate is extrapolated to --rows")
+    parser.add_argument("--backend", default=requirement2.INFERENCE_BACKEND,
+                        choices=list(requirement2.INFERENCE_BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    requirement2.INFERENCE_BACKEND = args.backend
+    rules = get_traffic_rules()
+    plans = compile_rules(rules)
+
+    sample = list(synthetic_vehicles(args.legacy_rows, args.seed))
+    mismatches = sum(set(evaluate_vehicle(v, plans)) != set(legacy_evaluate_vehicle(v, rules))
+                     for v in sample)
+    print(f"checked {len(sample)} rows against the legacy path: {mismatches} mismatches")
+
+    legacy_time, _ = time_rows(lambda v: legacy_evaluate_vehicle(v, rules), sample)
+    legacy_rate = len(sample) / legacy_time
+    compiled_time, flagged = time_rows(lambda v: evaluate_vehicle(v, plans),
+                                       synthetic_vehicles(args.rows, args.seed))
+    compiled_rate = args.rows / compiled_time
+
+    print(f"legacy   : {legacy_rate:10.0f} rows/s  (~{args.rows / legacy_rate:.1f} s for {args.rows} rows)")
+    print(f"compiled : {compiled_rate:10.0f} rows/s  ({compiled_time:.1f} s for {args.rows} rows, "
+          f"{flagged} with violations, backend {args.backend})")
+    print(f"speedup  : {compiled_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
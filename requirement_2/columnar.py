@@ -0,0 +1,294 @@
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from requirement2 import (BUS_LANE_HOURS, SCHOOL_HOURS, compile_rules, evaluate_vehicle,
+                          get_traffic_rules)
+
+NUMERIC_COLUMNS = ["speed", "parked_duration", "erp_balance", "charge_amount"]
+BOOLEAN_COLUMNS = ["is_bus", "erp_active", "school_zone", "made_uturn"]
+
+
+def load_vehicle_columns(filename, **read_csv_options):
+    """vehicle_data.csv as a DataFrame of typed columns, one row per record.
+
+    Numeric fields become float64 (NaN when unparseable) and the true/false
+    fields bool. Text fields are kept exactly as read, like load_vehicle_data
+    does, so rows can also be fed to the logic path.
+    """
+    df = pd.read_csv(filename, dtype=str, keep_default_na=False, **read_csv_options)
+    return type_vehicle_columns(df)
+
+
+def type_vehicle_columns(df):
+    for column in NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    for column in BOOLEAN_COLUMNS:
+        df[column] = df[column].str.strip().str.lower() == "true"
+    return df
+
+
+def _minutes(t):
+    return t.hour * 60 + t.minute
+
+
+def _per_value(column, func):
+    """func applied to each distinct value of a text column, spread back over the rows.
+
+    Locations, zone types, light colours and HH:MM stamps repeat heavily, so
+    this does the string work once per distinct value instead of once per row.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    return np.array([func(value) for value in uniques])[codes]
+
+
+def _stamp_minutes(stamp):
+    # same parsing as vehicle_facts; -1 (outside every window) when unparseable
+    try:
+        return _minutes(datetime.strptime(stamp.strip(), "%H:%M").time())
+    except Exception:
+        return -1
+
+
+def _in_windows(minutes, windows):
+    inside = np.zeros(len(minutes), dtype=bool)
+    for start, end in windows:
+        inside |= (minutes >= _minutes(start)) & (minutes <= _minutes(end))
+    return inside
+
+
+def fact_columns(df):
+    """Every fact of vehicle_facts (build_kb) as a boolean array over the rows."""
+    speed = df["speed"].to_numpy()
+    minutes = _per_value(df["timestamp"], _stamp_minutes)
+    school_zone = df["school_zone"].to_numpy()
+    zone_type = _per_value(df["zone_type"], lambda value: value.strip().lower())
+
+    return {
+        "red": _per_value(df["traffic_light"], lambda value: value.strip().lower() == "red"),
+        "speed_above_5": speed > 5,
+        "speed_above_30": speed > 30,
+        "speed_above_40": speed > 40,
+        "speed_above_60": speed > 60,
+        "is_bus": df["is_bus"].to_numpy(),
+        "illegal_parking": df["parked_duration"].to_numpy() > 5,
+        "erp_active": df["erp_active"].to_numpy(),
+        "erp_charge_violation": df["erp_balance"].to_numpy() < df["charge_amount"].to_numpy(),
+        "school_zone": school_zone,
+        "in_school_hours": school_zone & _in_windows(minutes, SCHOOL_HOURS),
+        "in_bus_lane_hours": _in_windows(minutes, BUS_LANE_HOURS),
+        "expressway": zone_type == "expressway",
+        "speed_within_expressway": speed <= 90,
+        "residential": zone_type == "residential",
+        "speed_within_residential": speed <= 50,
+        "made_uturn": df["made_uturn"].to_numpy(),
+    }
+
+
+def _entailed(rule_clause, query, facts, table, rows):
+    """Rows where facts plus the rule clause entail the violation.
+
+    Every fact symbol is known for every row, so this holds exactly when the
+    violation literal is in the clause and all its other literals are false.
+    A literal on a symbol that is not a fact is never false, so such a rule
+    never fires.
+    """
+    if query not in rule_clause:
+        return np.zeros(rows, dtype=bool)
+    fired = np.ones(rows, dtype=bool)
+    for literal in rule_clause:
+        if literal == query:
+            continue
+        values = facts.get(table.names[abs(literal)])
+        if values is None:
+            return np.zeros(rows, dtype=bool)
+        # the literal is false where its symbol is false (positive) or true (negated)
+        fired &= values if literal < 0 else ~values
+    return fired
+
+
+def violation_matrix(df, rules_by_location=None):
+    """Boolean DataFrame of rows x violations, matching evaluate_vehicle row for row.
+
+    rules_by_location is the get_traffic_rules() table or RulePlans from
+    compile_rules. Each rule becomes boolean array algebra over the fact
+    columns and is masked to rows at its location ("ALL" rules to every row).
+    """
+    if rules_by_location is None:
+        rules_by_location = get_traffic_rules()
+    plans = compile_rules(rules_by_location) if isinstance(rules_by_location, dict) else rules_by_location
+    table = plans.table
+    rows = len(df)
+    facts = fact_columns(df)
+    location = _per_value(df["location"], str.strip)
+
+    known = np.zeros(rows, dtype=bool)
+    columns = {}
+    for place, entries in plans.by_location.items():
+        at_place = location == place
+        known |= at_place
+        for violation, _, _, rule_clause, query in entries:
+            fired = _entailed(rule_clause, query, facts, table, rows) & at_place
+            columns[violation] = columns.get(violation, np.zeros(rows, dtype=bool)) | fired
+    # rows at locations with no rules of their own still get the "ALL" rules
+    for violation, _, _, rule_clause, query in plans.default:
+        fired = _entailed(rule_clause, query, facts, table, rows) & ~known
+        columns[violation] = columns.get(violation, np.zeros(rows, dtype=bool)) | fired
+    return pd.DataFrame(columns, index=df.index)
+
+
+ROW_ISSUES = [
+    "MissingData: location or timestamp missing",
+    "UnrealisticSpeed: speed > 150 km/h in non-expressway setting",
+    "NegativeSpeed: speed is negative",
+]
+
+
+def issue_matrix(df):
+    """row_inconsistencies as a boolean rows x ROW_ISSUES DataFrame."""
+    speed = df["speed"].to_numpy()
+    blank = lambda value: value.strip() == ""
+    missing = _per_value(df["location"], blank) | _per_value(df["timestamp"], blank)
+    expressway = _per_value(df["zone_type"], lambda value: value.strip().lower() == "expressway")
+    return pd.DataFrame({ROW_ISSUES[0]: missing,
+                         ROW_ISSUES[1]: ~expressway & (speed > 150),
+                         ROW_ISSUES[2]: speed < 0}, index=df.index)
+
+
+def findings(df, matrix, issues):
+    """Long-form findings in the same row and line order as requirement2.stream_violations."""
+    parts = []
+    for rank, frame in (("0", matrix), ("1", issues)):
+        for position, column in enumerate(frame.columns):
+            rows = np.flatnonzero(frame[column].to_numpy())
+            if len(rows):
+                # violations sort by name, issues keep their check order
+                order = rank + (column if rank == "0" else f"{position:02d}")
+                parts.append(pd.DataFrame({"row": rows, "order": order,
+                                           "kind": "violation" if rank == "0" else "inconsistency",
+                                           "detail": column}))
+    if not parts:
+        return pd.DataFrame(columns=["vehicle_id", "location", "timestamp", "kind", "detail"])
+    long = pd.concat(parts).sort_values(["row", "order"], kind="stable")
+    picked = df.iloc[long["row"].to_numpy()]
+    vehicle_id = _per_value(picked["vehicle_id"], lambda value: value.strip() or "Unknown")
+    return pd.DataFrame({
+        "vehicle_id": vehicle_id,
+        "location": _per_value(picked["location"], str.strip),
+        "timestamp": _per_value(picked["timestamp"], str.strip),
+        "kind": long["kind"].to_numpy(),
+        "detail": long["detail"].to_numpy(),
+    })
+
+
+def stream_violation_matrix(filename, output, rules_by_location=None, chunk_size=1000000):
+    """Columnar counterpart of requirement2.stream_violations, with the same output file.
+
+    The CSV is read chunk_size rows at a time, so peak memory depends on the
+    chunk size rather than the file. Returns (records, violations, inconsistencies).
+    """
+    if rules_by_location is None:
+        rules_by_location = get_traffic_rules()
+    plans = compile_rules(rules_by_location) if isinstance(rules_by_location, dict) else rules_by_location
+    records = violation_count = issue_count = 0
+    with open(output, "w", newline="") as out:
+        # csv module line endings, so both engines write byte-identical files
+        out.write("vehicle_id,location,timestamp,kind,detail\r\n")
+        for chunk in pd.read_csv(filename, dtype=str, keep_default_na=False, chunksize=chunk_size):
+            chunk = type_vehicle_columns(chunk)
+            matrix, issues = violation_matrix(chunk, plans), issue_matrix(chunk)
+            findings(chunk, matrix, issues).to_csv(out, header=False, index=False, lineterminator="\r\n")
+            out.flush()
+            records += len(chunk)
+            violation_count += int(matrix.to_numpy().sum())
+            issue_count += int(issues.to_numpy().sum())
+    return records, violation_count, issue_count
+
+
+def row_violations(matrix):
+    """Set of violation names for every row of a violation matrix."""
+    names = np.array(matrix.columns)
+    return [set(names[row]) for row in matrix.to_numpy()]
+
+
+def check_against_logic(df, matrix, rules_by_location=None):
+    """Indices of rows where the matrix disagrees with evaluate_vehicle."""
+    if rules_by_location is None:
+        rules_by_location = get_traffic_rules()
+    plans = compile_rules(rules_by_location) if isinstance(rules_by_location, dict) else rules_by_location
+    mismatches = []
+    for i, (vehicle, expected) in enumerate(zip(df.to_dict("records"), row_violations(matrix))):
+        if set(evaluate_vehicle(vehicle, plans)) != expected:
+            mismatches.append(df.index[i])
+    return mismatches
+
+
+def synthetic_columns(count, seed=0):
+    """Seeded random vehicle records generated column-wise, shaped like load_vehicle_columns output.
+
+    Text columns are categorical to keep tens of millions of rows in memory.
+    """
+    rng = np.random.default_rng(seed)
+    locations = np.array(["Tuas Expressway", "Orchard Road", "CBD", "School Street", "City Link",
+                          "Jurong East", "Changi Airport", "Bukit Timah"])
+    location_codes = rng.integers(0, len(locations), count)
+    location = pd.Categorical.from_codes(location_codes, locations)
+    zone_codes = np.where(location_codes == 0, 0, np.where(location_codes == 4, 1, 2))
+    stamps = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+    return pd.DataFrame({
+        "vehicle_id": pd.RangeIndex(count).astype(str),
+        "speed": rng.integers(0, 161, count).astype(float),
+        "traffic_light": pd.Categorical.from_codes(rng.integers(0, 3, count), ["red", "green", "yellow"]),
+        "is_bus": rng.random(count) < 0.1,
+        "parked_duration": np.array([0.0, 0.0, 0.0, 3.0, 10.0])[rng.integers(0, 5, count)],
+        "erp_active": rng.random(count) < 0.5,
+        "erp_balance": rng.integers(0, 11, count).astype(float),
+        "charge_amount": rng.integers(0, 6, count).astype(float),
+        "school_zone": location_codes == 3,
+        "location": location,
+        "zone_type": pd.Categorical.from_codes(zone_codes, ["expressway", "residential", "urban"]),
+        "timestamp": pd.Categorical.from_codes(rng.integers(0, 24 * 60, count), stamps),
+        "made_uturn": rng.random(count) < 0.05,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar traffic violation engine.")
+    parser.add_argument("csv", nargs="?", default="vehicle_data.csv")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use N generated rows instead of a CSV")
+    parser.add_argument("--check", type=int, nargs="?", const=-1, metavar="ROWS",
+                        help="compare with the logic path (on the first ROWS rows if given)")
+    parser.add_argument("--stream", metavar="OUTPUT",
+                        help="process the CSV in chunks, writing findings to OUTPUT")
+    parser.add_argument("--chunk-size", type=int, default=1000000)
+    args = parser.parse_args()
+
+    if args.stream:
+        start_time = time.perf_counter()
+        records, violations, issues = stream_violation_matrix(args.csv, args.stream,
+                                                              chunk_size=args.chunk_size)
+        print(f"{records} records: {violations} violations and {issues} single-record "
+              f"inconsistencies written to {args.stream} in {time.perf_counter() - start_time:.1f} s")
+        return
+
+    df = synthetic_columns(args.synthetic) if args.synthetic else load_vehicle_columns(args.csv)
+    start_time = time.perf_counter()
+    matrix = violation_matrix(df)
+    elapsed = time.perf_counter() - start_time
+    print(f"{len(df)} rows x {matrix.shape[1]} violations in {elapsed:.3f} s "
+          f"({len(df) / elapsed if elapsed else 0:.0f} rows/s)")
+    print(matrix.sum().to_string())
+
+    if args.check is not None:
+        rows = len(df) if args.check < 0 else args.check
+        mismatches = check_against_logic(df.iloc[:rows], matrix.iloc[:rows])
+        print(f"checked {rows} rows against evaluate_vehicle: {len(mismatches)} mismatches")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
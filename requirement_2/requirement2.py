@@ -1,5 +1,6 @@
+import argparse
 import csv
-from datetime import datetime
+from datetime import datetime, time
 import itertools
 import logic
 
@@ -145,10 +146,8 @@ def to_clause(sentence):
     else:
         raise Exception("to_clause: Unexpected sentence type (expected Symbol, Not, or Or)")
 
-def resolution_model_check(knowledge, query):
-    # convert knowledge base into a set of clauses
-    # convert negated query into clause and add
-    # apply resolution until empty or no new clauses
+def refutation_clauses(knowledge, query):
+    # clauses of the knowledge base plus the negated query
     clauses = {to_clause(s) for s in knowledge}
     neg_query = nnf(logic.Not(query))
     if isinstance(neg_query, logic.And):
@@ -156,7 +155,19 @@ def resolution_model_check(knowledge, query):
             clauses.add(to_clause(conjunct))
     else:
         clauses.add(to_clause(neg_query))
-    
+    return clauses
+
+def resolution_model_check(knowledge, query):
+    # convert knowledge base into a set of clauses
+    # convert negated query into clause and add
+    # apply resolution until empty or no new clauses
+    return resolution_refutes(refutation_clauses(knowledge, query))
+
+def resolution_refutes(clauses):
+    # True when resolution derives the empty clause from these string clauses
+    clauses = set(clauses)
+    if frozenset() in clauses:
+        return True
     new = set()
     while True:
         pairs = list(itertools.combinations(clauses, 2))
@@ -169,43 +180,335 @@ def resolution_model_check(knowledge, query):
             return False  # no new clause
         clauses = clauses.union(new)
 
-def resolution_inference(knowledge, query):
-    return resolution_model_check(knowledge, query)
+class SymbolTable:
+    """
+    interned integer encoding of literals: every symbol gets an id > 0,
+    a literal is its id (or -id when negated), and a clause is a sorted tuple
+    of literals. complementing is negation, and resolution and subsumption
+    work on small ints instead of "~"-prefixed strings.
+    one table (SYMBOLS) is shared by all vehicles, so the same fact or rule
+    maps to the same clause every time and is only encoded once.
+    """
 
+    def __init__(self):
+        self.ids = {}
+        self.names = [None]  # names[id]; id 0 is unused because -0 == 0
+        self.clauses = {}  # sentence -> encoded clause
 
-def build_kb(vehicle):
-    kb = set()
+    def literal(self, text):
+        negated = text.startswith("~")
+        name = text[1:] if negated else text
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return -symbol_id if negated else symbol_id
+
+    def literal_text(self, literal):
+        return self.names[literal] if literal > 0 else "~" + self.names[-literal]
+
+    def encode(self, clause):
+        # frozenset of string literals -> sorted tuple of int literals
+        return tuple(sorted(self.literal(lit) for lit in clause))
+
+    def decode(self, clause):
+        return frozenset(self.literal_text(lit) for lit in clause)
+
+    def clause(self, sentence):
+        encoded = self.clauses.get(sentence)
+        if encoded is None:
+            encoded = self.clauses[sentence] = self.encode(to_clause(sentence))
+        return encoded
+
+SYMBOLS = SymbolTable()
+
+def int_refutation_clauses(knowledge, query, table=SYMBOLS):
+    # refutation_clauses in the integer encoding
+    clauses = {table.clause(s) for s in knowledge}
+    neg_query = nnf(logic.Not(query))
+    if isinstance(neg_query, logic.And):
+        for conjunct in neg_query.conjuncts:
+            clauses.add(table.clause(conjunct))
+    else:
+        clauses.add(table.clause(neg_query))
+    return clauses
+
+def is_tautology(clause):
+    return any(-lit in clause for lit in clause if lit > 0)
+
+def subsumes(ci, cj):
+    # every literal of ci is in cj; both are sorted, so one merge pass
+    j = 0
+    for lit in ci:
+        while j < len(cj) and cj[j] < lit:
+            j += 1
+        if j == len(cj) or cj[j] != lit:
+            return False
+        j += 1
+    return True
+
+def resolve_int_clause(ci, cj, literal):
+    # resolvent of ci (containing literal) and cj (containing -literal); None if tautological
+    resolvent = tuple(sorted({x for x in ci if x != literal} | {x for x in cj if x != -literal}))
+    return None if is_tautology(resolvent) else resolvent
+
+def int_resolution_check(knowledge, query):
+    return int_resolution_refutes(int_refutation_clauses(knowledge, query))
+
+def int_resolution_refutes(clauses):
+    # resolution over integer clauses. each pair is tried once (new clauses only
+    # against clauses kept before them, found through a literal index), and
+    # clauses subsumed by a kept one are dropped, so the set stays small
+    seen = set()
+    units = set()
+    wide = []
+    by_literal = {}
+
+    def subsumed(clause):
+        return (clause in seen or any(lit in units for lit in clause)
+                or any(subsumes(c, clause) for c in wide if len(c) <= len(clause)))
+
+    def keep(clause):
+        seen.add(clause)
+        if len(clause) == 1:
+            units.add(clause[0])
+        else:
+            wide.append(clause)
+
+    new = []
+    for clause in sorted(clauses, key=len):
+        if not clause:
+            return True
+        if not is_tautology(clause) and not subsumed(clause):
+            keep(clause)
+            new.append(clause)
+    while new:
+        added = []
+        for clause in new:
+            for lit in clause:
+                for other in by_literal.get(-lit, ()):
+                    resolvent = resolve_int_clause(clause, other, lit)
+                    if resolvent is None:
+                        continue
+                    if not resolvent:
+                        return True  # empty clause
+                    if not subsumed(resolvent):
+                        keep(resolvent)
+                        added.append(resolvent)
+            for lit in clause:
+                by_literal.setdefault(lit, []).append(clause)
+        new = added
+    return False
+
+def satisfiable(clauses):
+    """
+    DPLL over integer-encoded clauses (see SymbolTable): unit propagation,
+    branching only when propagation stalls. each clause keeps a count of true literals and of unassigned literals,
+    and occurrence lists mean setting a literal only touches the clauses
+    that mention it, so propagation is linear in the size of the clause set.
+    a knowledge base of unit facts plus rule clauses is decided by
+    propagation alone, without any branching.
+    """
+    clauses = [c for c in clauses if not is_tautology(c)]
+    if all(len(c) == 1 for c in clauses):
+        # only unit clauses: satisfiable unless some literal meets its complement
+        units = {c[0] for c in clauses}
+        return not any(-lit in units for lit in units)
+    occurs = {}
+    for i, clause in enumerate(clauses):
+        for lit in clause:
+            occurs.setdefault(lit, []).append(i)
+    true_count = [0] * len(clauses)
+    free_count = [len(c) for c in clauses]
+    assigned = set()
+    trail = []
+
+    def assign(literal):
+        # make literal true; returns False on a conflict
+        trail.append(literal)
+        assigned.add(literal)
+        for i in occurs.get(literal, ()):
+            true_count[i] += 1
+            free_count[i] -= 1
+        units = []
+        conflict = False
+        for i in occurs.get(-literal, ()):
+            free_count[i] -= 1
+            if true_count[i] == 0:
+                if free_count[i] == 0:
+                    conflict = True
+                elif free_count[i] == 1:
+                    units.append(i)
+        return not conflict, units
+
+    def unassign_to(mark):
+        while len(trail) > mark:
+            literal = trail.pop()
+            assigned.discard(literal)
+            for i in occurs.get(literal, ()):
+                true_count[i] -= 1
+                free_count[i] += 1
+            for i in occurs.get(-literal, ()):
+                free_count[i] += 1
+
+    def free_literal(clause):
+        for lit in clause:
+            if lit not in assigned and -lit not in assigned:
+                return lit
+        return None
+
+    def propagate(pending):
+        # pending holds indices of clauses that may have become unit
+        while pending:
+            i = pending.pop()
+            if true_count[i]:
+                continue
+            lit = free_literal(clauses[i])
+            if lit is None:
+                return False
+            ok, units = assign(lit)
+            if not ok:
+                return False
+            pending.extend(units)
+        return True
+
+    def search(pending):
+        if not propagate(pending):
+            return False
+        for i, clause in enumerate(clauses):
+            if true_count[i] == 0:
+                break
+        else:
+            return True  # every clause satisfied
+        lit = free_literal(clauses[i])
+        for choice in (lit, -lit):
+            mark = len(trail)
+            ok, units = assign(choice)
+            if ok and search(units):
+                return True
+            unassign_to(mark)
+        return False
+
+    if any(not clause for clause in clauses):
+        return False
+    return search([i for i, clause in enumerate(clauses) if len(clause) == 1])
+
+def unit_propagation_check(knowledge, query):
+    # knowledge entails query iff knowledge plus the negated query is unsatisfiable
+    return not satisfiable(int_refutation_clauses(knowledge, query))
+
+def unsatisfiable(clauses):
+    return not satisfiable(clauses)
+
+def decoded_resolution_refutes(clauses, table=SYMBOLS):
+    return resolution_refutes({table.decode(c) for c in clauses})
+
+# inference backends for resolution_inference; all decide the same entailment
+INFERENCE_BACKENDS = {
+    "resolution": resolution_model_check,
+    "int_resolution": int_resolution_check,
+    "unit_propagation": unit_propagation_check,
+}
+# the same backends on already encoded clauses: True when the clauses are unsatisfiable
+REFUTATION_BACKENDS = {
+    "resolution": decoded_resolution_refutes,
+    "int_resolution": int_resolution_refutes,
+    "unit_propagation": unsatisfiable,
+}
+INFERENCE_BACKEND = "unit_propagation"
+# when True, every inference is repeated with full resolution and must agree
+CROSS_CHECK = False
+
+def resolution_inference(knowledge, query, backend=None):
+    result = INFERENCE_BACKENDS[backend or INFERENCE_BACKEND](knowledge, query)
+    if CROSS_CHECK and result != resolution_model_check(knowledge, query):
+        raise Exception(f"resolution_inference: backends disagree on {query.formula()}")
+    return result
+
+def refutes(clauses, backend=None):
+    # clause-level resolution_inference: clauses already include the negated query
+    clauses = list(clauses)
+    result = REFUTATION_BACKENDS[backend or INFERENCE_BACKEND](clauses)
+    if CROSS_CHECK and result != decoded_resolution_refutes(clauses):
+        raise Exception("refutes: backends disagree")
+    return result
+
+def simplify(clauses, facts):
+    # clauses under a consistent set of true literals: satisfied clauses are
+    # dropped and falsified literals removed, so no fact symbol remains and
+    # the result is unsatisfiable exactly when clauses plus facts are
+    for clause in clauses:
+        if not any(lit in facts for lit in clause):
+            yield tuple(lit for lit in clause if -lit not in facts)
+
+def parse_cnf_clause(cnf_clause):
+    # "(a OR ~b OR c)" from get_traffic_rules -> logic sentence
+    clause_str = cnf_clause.strip("()")
+    literals = []
+    for lit in clause_str.split("OR"):
+        lit = lit.strip()
+        if lit.startswith("~"):
+            literals.append(logic.Not(logic.Symbol(lit[1:])))
+        else:
+            literals.append(logic.Symbol(lit))
+    if len(literals) == 1:
+        return literals[0]
+    return logic.Or(*literals)
+
+class RulePlans:
+    """
+    traffic rules compiled once: for every location, the list of
+    (violation, description, rule sentence, encoded rule clause, query literal)
+    that applies there (its own rules followed by the "ALL" rules).
+    evaluating a vehicle then needs no string parsing and no KB copies.
+    """
+
+    def __init__(self, rules_by_location, table=SYMBOLS):
+        self.table = table
+        compiled = {}
+        for location, rules in rules_by_location.items():
+            entries = []
+            for violation, description, cnf_clause in rules:
+                rule = parse_cnf_clause(cnf_clause)
+                entries.append((violation, description, rule, table.clause(rule),
+                                table.literal(violation)))
+            compiled[location] = entries
+        everywhere = compiled.get("ALL", [])
+        self.default = everywhere
+        self.by_location = {location: entries + everywhere
+                            for location, entries in compiled.items()}
+
+    def plan_for(self, location):
+        return self.by_location.get(location, self.default)
+
+def compile_rules(rules_by_location, table=SYMBOLS):
+    return RulePlans(rules_by_location, table)
+
+
+# bus lane hours, non buses cannot in bus lane (7:30-9:30, 17:00-20:00)
+BUS_LANE_HOURS = [(time(7, 30), time(9, 30)), (time(17, 0), time(20, 0))]
+# school zone hours, vehicles shouldn't go past 60kmh (6:30-7:45, 12:00-14:30, 18:00-19:00)
+SCHOOL_HOURS = [(time(6, 30), time(7, 45)), (time(12, 0), time(14, 30)), (time(18, 0), time(19, 0))]
+
+def vehicle_facts(vehicle):
+    # truth value of every fact symbol for one vehicle record
     try:
         t = datetime.strptime(vehicle["timestamp"].strip(), "%H:%M").time()
     except Exception:
         t = None
 
-    # bus lane hours, non buses cannot in bus lane (7:30-9:30, 17:00-20:00)
     if t is not None:
-        bus_start_morn = datetime.strptime("07:30", "%H:%M").time()
-        bus_end_morn   = datetime.strptime("09:30", "%H:%M").time()
-        bus_start_even = datetime.strptime("17:00", "%H:%M").time()
-        bus_end_even   = datetime.strptime("20:00", "%H:%M").time()
-        in_bus_lane_hours = ((bus_start_morn <= t <= bus_end_morn) or 
-                             (bus_start_even <= t <= bus_end_even))
+        in_bus_lane_hours = any(start <= t <= end for start, end in BUS_LANE_HOURS)
     else:
         in_bus_lane_hours = False
 
-    # school zone hours, vehicles shouldn't go past 60kmh (6:30-7:45, 12:00-14:30, 18:00-19:00)
     if t is not None and vehicle["school_zone"]:
-        school_start_1 = datetime.strptime("06:30", "%H:%M").time()
-        school_end_1   = datetime.strptime("07:45", "%H:%M").time()
-        school_start_2 = datetime.strptime("12:00", "%H:%M").time()
-        school_end_2   = datetime.strptime("14:30", "%H:%M").time()
-        school_start_3 = datetime.strptime("18:00", "%H:%M").time()
-        school_end_3   = datetime.strptime("19:00", "%H:%M").time()
-        in_school_hours = ((school_start_1 <= t <= school_end_1) or
-                           (school_start_2 <= t <= school_end_2) or
-                           (school_start_3 <= t <= school_end_3))
+        in_school_hours = any(start <= t <= end for start, end in SCHOOL_HOURS)
     else:
         in_school_hours = False
 
-    facts = {
+    zone_type = vehicle["zone_type"].strip().lower()
+    return {
         "red": vehicle["traffic_light"].strip().lower() == "red",
         "speed_above_5": vehicle["speed"] > 5,
         "speed_above_30": vehicle["speed"] > 30,
@@ -218,13 +521,16 @@ def build_kb(vehicle):
         "school_zone": vehicle["school_zone"],
         "in_school_hours": in_school_hours, 
         "in_bus_lane_hours": in_bus_lane_hours,
-        "expressway": vehicle["zone_type"].strip().lower() == "expressway",
+        "expressway": zone_type == "expressway",
         "speed_within_expressway": vehicle["speed"] <= 90,
-        "residential": vehicle["zone_type"].strip().lower() == "residential",
+        "residential": zone_type == "residential",
         "speed_within_residential": vehicle["speed"] <= 50,
         "made_uturn": vehicle["made_uturn"] 
     }
-    for symbol, value in facts.items():
+
+def build_kb(vehicle):
+    kb = set()
+    for symbol, value in vehicle_facts(vehicle).items():
         if value:
             kb.add(logic.Symbol(symbol))
         else:
@@ -236,8 +542,14 @@ def build_kb(vehicle):
         print("-" * 40)
     return kb
 
-def load_vehicle_data(filename):
-    vehicles = []
+def fact_literals(vehicle, table=SYMBOLS):
+    # build_kb as a set of encoded true literals, without building logic sentences
+    literal = table.literal
+    return {literal(symbol) if value else -literal(symbol)
+            for symbol, value in vehicle_facts(vehicle).items()}
+
+def iter_vehicle_data(filename):
+    # vehicle records one at a time, so a file never has to fit in memory
     with open(filename, newline='') as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
@@ -252,8 +564,20 @@ def load_vehicle_data(filename):
             row["erp_active"] = row["erp_active"].strip().lower() == "true"
             row["school_zone"] = row["school_zone"].strip().lower() == "true"
             row["made_uturn"] = row["made_uturn"].strip().lower() == "true"
-            vehicles.append(row)
-    return vehicles
+            yield row
+
+def load_vehicle_data(filename):
+    return list(iter_vehicle_data(filename))
+
+def chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 def load_traffic_rules(filename):
     return {}
@@ -295,37 +619,40 @@ def check_inconsistencies(vehicles):
             inconsistencies.setdefault(vid, set()).add("NegativeSpeed: speed is negative")
     return inconsistencies
 
+def row_inconsistencies(vehicle):
+    # the checks of check_inconsistencies that need only this one record
+    issues = []
+    if vehicle["location"].strip() == "" or vehicle["timestamp"].strip() == "":
+        issues.append("MissingData: location or timestamp missing")
+    if vehicle.get("zone_type", "").strip().lower() != "expressway" and vehicle["speed"] > 150:
+        issues.append("UnrealisticSpeed: speed > 150 km/h in non-expressway setting")
+    if vehicle["speed"] < 0:
+        issues.append("NegativeSpeed: speed is negative")
+    return issues
+
 def evaluate_vehicle(vehicle, rules_by_location, debug=False):
+    # rules_by_location may be the raw get_traffic_rules() table or RulePlans
+    # from compile_rules; compile once and pass the plans when evaluating many
+    if not isinstance(rules_by_location, RulePlans):
+        rules_by_location = compile_rules(rules_by_location)
     violations = []
-    kb = build_kb(vehicle)
+    facts = fact_literals(vehicle, rules_by_location.table)
+    if debug:
+        kb = build_kb(vehicle)
     vehicle_loc = vehicle["location"].strip()
-    applicable_rules = rules_by_location.get(vehicle_loc, []) + rules_by_location.get("ALL", [])
-    
-    for violation, description, cnf_clause in applicable_rules:
-        clause_str = cnf_clause.strip("()")
-        literals = []
-        for lit in clause_str.split("OR"):
-            lit = lit.strip()
-            if lit.startswith("~"):
-                literals.append(logic.Not(logic.Symbol(lit[1:])))
-            else:
-                literals.append(logic.Symbol(lit))
-        if len(literals) == 1:
-            rule_clause = literals[0]
-        else:
-            rule_clause = logic.Or(*literals)
-        # add rule clause to copy of knowledge base
-        kb_with_rule = kb.copy()
-        kb_with_rule.add(rule_clause)
+
+    for violation, description, rule, rule_clause, query in rules_by_location.plan_for(vehicle_loc):
         if debug:
             print("Evaluating rule:", violation)
-            print("Rule clause:", rule_clause.formula())
+            print("Rule clause:", rule.formula())
             print("KB with rule added:")
-            for s in kb_with_rule:
+            for s in kb | {rule}:
                 print("  ", s.formula())
-        # check if knowledge base entails violation
-        query = logic.Symbol(violation)
-        result = resolution_inference(kb_with_rule, query)
+        # check if knowledge base plus rule entails violation, i.e. with the
+        # negated violation added the clauses are unsatisfiable. the KB is all
+        # unit facts, so they are applied up front and only what is left of the
+        # rule and the negated violation goes to the inference backend
+        result = refutes(simplify((rule_clause, (-query,)), facts))
         if debug:
             print("Result of resolution-based inference for", violation, ":", result)
             print("-" * 40)
@@ -334,9 +661,60 @@ def evaluate_vehicle(vehicle, rules_by_location, debug=False):
     return list(set(violations))
 
 
+def evaluate_chunks(chunks, rules_by_location):
+    # for every chunk of records, the list of (record, violations, row issues)
+    plans = compile_rules(rules_by_location) if not isinstance(rules_by_location, RulePlans) else rules_by_location
+    for chunk in chunks:
+        yield [(vehicle, evaluate_vehicle(vehicle, plans), row_inconsistencies(vehicle))
+               for vehicle in chunk]
+
+def stream_violations(filename, output, rules_by_location=None, chunk_size=10000):
+    """
+    parse, evaluate and write vehicle_data in chunks of chunk_size records.
+    every finding is written as it is found, one CSV line per
+    (vehicle_id, location, timestamp, kind, detail), so peak memory depends on
+    chunk_size and not on the size of the file. only the single-record
+    inconsistency checks run here; check_inconsistencies compares records of
+    the same vehicle and needs them all in memory.
+    returns (records, violations, inconsistencies) counts.
+    """
+    if rules_by_location is None:
+        rules_by_location = get_traffic_rules()
+    chunks = chunked(iter_vehicle_data(filename), chunk_size)
+    records = violation_count = issue_count = 0
+    with open(output, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["vehicle_id", "location", "timestamp", "kind", "detail"])
+        for results in evaluate_chunks(chunks, rules_by_location):
+            for vehicle, violations, issues in results:
+                vid = vehicle["vehicle_id"].strip() if vehicle["vehicle_id"].strip() else "Unknown"
+                where = (vehicle["location"].strip(), vehicle["timestamp"].strip())
+                for violation in sorted(violations):
+                    writer.writerow([vid, *where, "violation", violation])
+                for issue in issues:
+                    writer.writerow([vid, *where, "inconsistency", issue])
+                violation_count += len(violations)
+                issue_count += len(issues)
+            records += len(results)
+            out.flush()
+    return records, violation_count, issue_count
+
 def main():
-    vehicles = load_vehicle_data("vehicle_data.csv")
-    rules_by_location = get_traffic_rules() 
+    parser = argparse.ArgumentParser(description="Traffic rule violations and inconsistencies.")
+    parser.add_argument("csv", nargs="?", default="vehicle_data.csv")
+    parser.add_argument("--stream", metavar="OUTPUT",
+                        help="process in chunks, writing findings to OUTPUT as they are found")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.stream:
+        records, violations, issues = stream_violations(args.csv, args.stream, chunk_size=args.chunk_size)
+        print(f"{records} records: {violations} violations and {issues} single-record "
+              f"inconsistencies written to {args.stream}")
+        return
+
+    vehicles = load_vehicle_data(args.csv)
+    rules_by_location = compile_rules(get_traffic_rules())
     
     violations_report = {}
     for vehicle in vehicles: